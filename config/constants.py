@@ -23,6 +23,27 @@ TOKENS = {
     "ETH": "0x0000000000000000000000000000000000000000"
 }
 
+WETH_ADDRESS = "0x4200000000000000000000000000000000000006"
+
+ERC20_ABI = [
+    {
+        "constant": True,
+        "inputs": [{"name": "", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
 SUPERBRIDGE_API = "https://api.superbridge.app/api/v2/bridge/routes"
 LAYERSWAP_NETWORKS = {
     "arbitrum": "ARBITRUM_MAINNET",
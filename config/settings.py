@@ -10,6 +10,95 @@ SETTINGS = {
     'PRICE_ETH': 2800,  # резервное значение на случай если API выдаст ошибку
 
     "MAX_THREADS": 3,
+    "CONCURRENCY": {
+        "ENABLED": True,  # адаптивный лимит одновременно выполняемых модулей вместо MAX_THREADS (движок threads, без конвейера)
+        "INITIAL_LIMIT": 3,
+        "MIN_LIMIT": 1,
+        "MAX_LIMIT": 32,  # верхняя граница (столько рабочих потоков создается)
+        "TARGET_P95_LATENCY": 3,  # целевая p95 задержка запросов модулей к RPC (секунды)
+        "TARGET_ERROR_RATE": 0.05,
+        "DECREASE_FACTOR": 0.5,  # во сколько раз уменьшать лимит при 429/5xx/таймаутах
+        "WINDOW": 200,  # последних запросов для расчета p95
+        "ADJUST_INTERVAL": 10  # как часто пересчитывать лимит (секунды)
+    },
+    "RPC_POOL": {
+        "CONNECTIONS_PER_THREAD": 2,  # соединений к RPC на один поток (запас для фоновых сервисов)
+        "TIMEOUT": 30
+    },
+    "RECEIPT_WATCHER": {
+        "POLL_INTERVAL": 1,  # как часто проверять новые блоки (секунды)
+        "SWEEP_INTERVAL": 30,  # через сколько секунд запрашивать receipt напрямую
+        "TIMEOUT": 180
+    },
+    "FEE_ORACLE": {
+        "MODE": "legacy",  # legacy (gasPrice) или eip1559 (maxFeePerGas / maxPriorityFeePerGas)
+        "TTL": 2,  # время жизни кэша в секундах (примерно время блока Lisk)
+        "HISTORY_BLOCKS": 5,
+        "PRIORITY_PERCENTILE": 50,
+        "BASE_FEE_MULTIPLIER": 2
+    },
+    "PREFLIGHT": {
+        "ENABLED": True  # eth_call собранной транзакции перед подписью, заведомо неуспешные не отправляются
+    },
+    "SIGNER": {
+        "PROCESSES": 0,  # процессов для подписи пачек (0 - подпись в текущем процессе)
+        "MIN_POOL_BATCH": 8,  # пачки меньше этого подписываются без пула
+        "BATCH_SIZE": 32  # максимум транзакций в пачке стадии подписи конвейера
+    },
+    "MULTICALL": {
+        "BATCH_SIZE": 500  # максимум вызовов в одном aggregate3
+    },
+    "HTTP_CLIENT": {
+        "TIMEOUT": 30,  # таймаут запросов к внешним API по умолчанию
+        "MAX_SESSIONS": 256  # максимум keep-alive сессий (прокси, хост) в пуле
+    },
+    "CHAIN_REGISTRY": {
+        "URL": "https://chainid.network/chains.json",
+        "CACHE_PATH": "cache/chains.json",
+        "REVALIDATE_INTERVAL": 3600  # как часто проверять обновление файла (секунды)
+    },
+    "ROUTE_MATRIX": {
+        "REFRESH_INTERVAL": 900  # как часто обновлять доступные маршруты бриджей (секунды)
+    },
+    "SNAPSHOT": {
+        "ENABLED": True,  # снимок балансов всех кошельков перед запуском
+        "RPC_BATCH_SIZE": 100,  # eth_getBalance в одном JSON-RPC batch
+        "MIN_ETH_BALANCE": 0.00001  # кошельки с меньшим балансом ETH и без WETH пропускаются
+    },
+    "COORDINATOR": {
+        "HOST": "0.0.0.0",  # адрес сервиса координатора (--coordinator)
+        "PORT": 8765,
+        "LEASE_TTL": 300,  # через сколько секунд без heartbeat кошелек отдается другому воркеру
+        "HEARTBEAT_INTERVAL": 60,
+        "CLAIM_RETRY_INTERVAL": 30,  # пауза воркера, когда все кошельки розданы, но не завершены
+        "FINISH_GRACE": 120  # сколько секунд после завершения ждать, пока воркеры получат finished
+    },
+    "RESULTS": {
+        "JOURNAL_PATH": "cache/results.jsonl",  # результаты текущего запуска, дописываются построчно
+        "CHECKPOINT_INTERVAL": 300  # как часто пересобирать results.xlsx из журнала (секунды, 0 - только при выходе)
+    },
+    "JOURNAL": {
+        "ENABLED": True,  # журнал выполнения для продолжения запуска (--resume)
+        "PATH": "cache/journal.sqlite3"
+    },
+    "PIPELINE": {
+        "ENABLED": True,  # модули с build_transactions отправляются через конвейер
+        "QUEUE_SIZE": 100,  # размер очереди между стадиями
+        "BUILD_WORKERS": 4,  # сборка и оценка газа (запросы к RPC и API)
+        "SIGN_WORKERS": 1,  # очереди подписи и отправки разбиты по кошелькам - порядок nonce сохраняется
+        "BROADCAST_WORKERS": 4
+    },
+    "WALLET_LOADER": {
+        "CHUNK_SIZE": 1000  # строк файла кошельков, читаемых и проверяемых за раз (и размер части снимка балансов)
+    },
+    "SCHEDULER": {
+        "MAX_ACTIVE_WALLETS": 50  # кошельков в работе одновременно (паузы не занимают потоки)
+    },
+    "ASYNC_ENGINE": {
+        "MAX_CONCURRENT_WALLETS": 100,  # кошельков в работе одновременно (--engine asyncio)
+        "MAX_BLOCKING_THREADS": 32,  # потоки для синхронных модулей внутри event loop
+        "RPC_CONNECTIONS": 100  # keep-alive соединений к RPC
+    },
     "DELAYS": {
         "BETWEEN_WALLETS": {
             "MIN": 66,
@@ -0,0 +1,56 @@
+import asyncio
+from abc import abstractmethod
+from typing import List
+
+from web3.exceptions import ContractLogicError, Web3RPCError, InvalidAddress
+
+from core.base_module import BaseModule, PreflightError
+from core.nonce_manager import NonceManager
+from core.provider_registry import get_async_web3
+from core.receipt_watcher import get_receipt_watcher
+from core.wallet_manager import Wallet, Chain, TransactionResult
+
+
+class AsyncBaseModule(BaseModule):
+    """
+    Асинхронный вариант BaseModule для asyncio движка. Nonce, комиссии и снимок
+    балансов общие с синхронными модулями, поэтому модули можно переносить по одному.
+    """
+
+    def __init__(self, nonce_manager: NonceManager):
+        super().__init__(nonce_manager)
+        self.async_w3 = get_async_web3()
+
+    async def prepare_transaction_async(self, wallet: Wallet, tx: dict) -> dict:
+        # Первый запрос nonce для адреса идет в RPC - не блокируем event loop
+        return await asyncio.to_thread(self.prepare_transaction, wallet, tx)
+
+    async def estimate_gas_async(self, tx: dict, multiplier: float = 1.0) -> int:
+        """Оценка газа на AsyncWeb3, ошибки исполнения - PreflightError, как в estimate_gas"""
+        try:
+            return int(await self.async_w3.eth.estimate_gas(tx) * multiplier)
+        except (ContractLogicError, Web3RPCError, InvalidAddress, ValueError) as e:
+            raise PreflightError(self.classify_preflight_error(e), str(e)) from e
+
+    async def get_fee_fields(self) -> dict:
+        return await asyncio.to_thread(self.fee_oracle.get_fee_fields)
+
+    async def wait_for_receipt_async(self, tx_hash):
+        """Ожидание receipt через общий ReceiptWatcher без блокировки потока"""
+        if self.journal:
+            self.journal.record_tx(tx_hash)
+        receipt = await asyncio.wrap_future(get_receipt_watcher().watch(tx_hash))
+        if self.journal:
+            self.journal.set_tx_status(tx_hash, receipt)
+        return receipt
+
+    @abstractmethod
+    async def process_transaction(self, wallet: Wallet, destination_chain: Chain, amount: dict,
+                                  wallet_number: int) -> TransactionResult:
+        """Process a transaction using the module's specific logic"""
+        pass
+
+    @abstractmethod
+    async def get_available_chains(self, wallet_number: int = None, proxy: dict = None) -> List[Chain]:
+        """Get list of chains supported by this module"""
+        pass
@@ -0,0 +1,151 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from loguru import logger
+
+from config.settings import SETTINGS
+from core.job_journal import current_run_id
+from core.portfolio_snapshot import get_portfolio_snapshot
+from core.provider_registry import ProviderRegistry
+from core.wallet_manager import Wallet
+from utils.logger import log_module_start
+
+
+class AsyncEngine:
+    """
+    Движок на asyncio: каждый кошелек - корутина, задержки через asyncio.sleep,
+    поэтому ожидание не занимает потоки и число кошельков в работе ограничено
+    только MAX_CONCURRENT_WALLETS. Асинхронные модули выполняются в event loop,
+    еще не перенесенные синхронные - в пуле потоков через asyncio.to_thread.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.settings = SETTINGS["ASYNC_ENGINE"]
+        self._results_lock: asyncio.Lock = None
+
+    async def _run_module(self, module, *args):
+        if asyncio.iscoroutinefunction(module.process_transaction):
+            return await module.process_transaction(*args)
+        return await asyncio.to_thread(module.process_transaction, *args)
+
+    async def _update_results(self, wallet, destination_chain, result):
+        # Запись results.xlsx синхронная - выполняется в потоке, по одной за раз
+        async with self._results_lock:
+            await asyncio.to_thread(self.bot.results_tracker.update_results, wallet, destination_chain, result)
+
+    async def process_wallet(self, wallet: Wallet, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            wallet_number = self.bot.get_wallet_number()
+            try:
+                contracts_to_process = wallet.contracts_count
+                contracts_processed = self.bot.get_processed_count(wallet)
+
+                if contracts_processed >= contracts_to_process:
+                    logger.info(f"[Account #{wallet_number}] Already processed in previous run, skipping")
+                    return
+
+                logger.info(f"[Account #{wallet_number}] Planning to process {contracts_to_process - contracts_processed} contracts")
+
+                # Проверяем и выводим WETH если есть
+                weth_result = await asyncio.to_thread(
+                    self.bot.weth_module.check_and_withdraw_weth, wallet, wallet_number
+                )
+                if not weth_result.success:
+                    logger.warning(f"[Account #{wallet_number}] Failed to process WETH: {weth_result.error_message}")
+
+                # Добавляем задержку между кошельками
+                if wallet_number > 1:
+                    delay = self.bot.get_delay("BETWEEN_WALLETS")
+                    logger.info(f"[Account #{wallet_number}] Waiting {delay:.2f} seconds before processing")
+                    await asyncio.sleep(delay)
+
+                plan = self.bot.plan_compiler.compile(wallet, contracts_to_process - contracts_processed, wallet_number)
+
+                for index, step in enumerate(plan.steps):
+                    module, destination_chain = step.module, step.destination_chain
+                    log_module_start(module.module_name, wallet_number)
+
+                    delay = self.bot.get_delay("BETWEEN_TRANSACTIONS")
+                    logger.info(f"[Account #{wallet_number}] Waiting {delay:.2f} seconds before transaction")
+                    await asyncio.sleep(delay)
+
+                    if self.bot.is_wallet_lost(wallet):
+                        logger.warning(f"[Account #{wallet_number}] Lease lost, wallet stopped")
+                        return
+
+                    logger.info(f"[Account #{wallet_number}] Selected chain: {destination_chain.name}")
+                    journal = self.bot.journal
+                    run_id = journal.begin_run(
+                        wallet.address, module.module_name, destination_chain.id, module.expected_transactions
+                    ) if journal else None
+
+                    # Контекст задачи копируется и в asyncio.to_thread
+                    token = current_run_id.set(run_id)
+                    try:
+                        result = await self._run_module(
+                            module,
+                            wallet,
+                            destination_chain,
+                            step.amount_spec,
+                            wallet_number
+                        )
+                    finally:
+                        current_run_id.reset(token)
+
+                    if journal:
+                        journal.finish_run(run_id, result)
+                    await self._update_results(wallet, destination_chain, result)
+                    contracts_processed += 1
+                    logger.info(
+                        f"[Account #{wallet_number}] Processed {contracts_processed}/{contracts_to_process} contracts")
+
+                    if index < len(plan.steps) - 1:
+                        delay = self.bot.get_delay("BETWEEN_MODULES")
+                        logger.info(f"[Account #{wallet_number}] Waiting {delay:.2f} seconds before next module")
+                        await asyncio.sleep(delay)
+
+            except Exception as e:
+                logger.error(f"[Account #{wallet_number}] Error processing wallet {wallet.address}: {str(e)}")
+            finally:
+                # Запись снимка больше не нужна - память не растет с числом кошельков
+                get_portfolio_snapshot().invalidate(wallet.address)
+
+    async def _process_and_report(self, wallet: Wallet, semaphore: asyncio.Semaphore, on_wallet_done):
+        await self.process_wallet(wallet, semaphore)
+        if on_wallet_done is not None:
+            try:
+                await asyncio.to_thread(on_wallet_done, wallet)
+            except Exception as e:
+                logger.error(f"Failed to report completion of {wallet.address}: {str(e)}")
+
+    async def _run(self, wallets: Iterable[Wallet], on_wallet_done: Optional[Callable] = None):
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.settings["MAX_BLOCKING_THREADS"])
+        loop.set_default_executor(executor)
+
+        self._results_lock = asyncio.Lock()
+        semaphore = asyncio.Semaphore(self.settings["MAX_CONCURRENT_WALLETS"])
+
+        await ProviderRegistry.open_async_session()
+        try:
+            # Кошельки берутся из итератора по мере освобождения мест, а не все сразу
+            iterator = iter(wallets)
+            pending = set()
+            while True:
+                if len(pending) >= self.settings["MAX_CONCURRENT_WALLETS"]:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Загрузка следующего кошелька может читать файл или ждать RPC - вне event loop
+                wallet = await asyncio.to_thread(next, iterator, None)
+                if wallet is None:
+                    break
+                pending.add(asyncio.create_task(self._process_and_report(wallet, semaphore, on_wallet_done)))
+            if pending:
+                await asyncio.wait(pending)
+        finally:
+            await ProviderRegistry.get_async_web3().provider.disconnect()
+
+    def run(self, wallets: Iterable[Wallet], on_wallet_done: Optional[Callable] = None):
+        logger.info(f"Async engine: up to {self.settings['MAX_CONCURRENT_WALLETS']} wallets concurrently")
+        asyncio.run(self._run(wallets, on_wallet_done))
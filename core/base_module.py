@@ -1,15 +1,47 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from core.wallet_manager import Wallet, Chain, TransactionResult
 from core.nonce_manager import NonceManager
+from core.fee_oracle import get_fee_oracle
+from core.receipt_watcher import get_receipt_watcher
+from core.portfolio_snapshot import get_portfolio_snapshot
+from core.provider_registry import get_web3
+from core.http_client import get_http_client
+from core.tx_builder import get_tx_builder
+from core.signer import get_signer
+from core.contract_factory import get_contract_factory
+from core.job_journal import get_job_journal
 from config.settings import SETTINGS
+from loguru import logger
+from requests.exceptions import RequestException
+from web3.exceptions import ContractLogicError, Web3RPCError, InvalidAddress, ProviderConnectionError
+
+
+class PreflightError(Exception):
+    """Транзакция не пройдет (eth_call на pending блоке), отправка отменена до подписи"""
+
+    def __init__(self, kind: str, reason: str):
+        super().__init__(f"Preflight {kind}: {reason}")
+        self.kind = kind
+        self.reason = reason
 
 
 class BaseModule(ABC):
+    # Бридж модули выбирают сеть назначения по bridge_chain_id кошелька
+    is_bridge = False
+    # Сколько транзакций отправляет запуск модуля (для журнала), None - задается через expect_transactions
+    expected_transactions: Optional[int] = 1
+
     def __init__(self, nonce_manager: NonceManager):
         self.settings = SETTINGS
         self.module_name = self.__class__.__name__
         self.nonce_manager = nonce_manager
+        self.fee_oracle = get_fee_oracle()
+        self.snapshot = get_portfolio_snapshot()
+        self.http = get_http_client()
+        self.journal = get_job_journal()
+        self.tx_builder = get_tx_builder()
+        self.contracts = get_contract_factory()
 
     def prepare_transaction(self, wallet: Wallet, tx: dict) -> dict:
         """Подготовка транзакции с безопасным получением nonce"""
@@ -17,6 +49,8 @@ class BaseModule(ABC):
             # Получаем следующий доступный nonce
             nonce = self.nonce_manager.get_next_nonce(wallet.address)
             tx["nonce"] = nonce
+            # После транзакции балансы из снимка для кошелька больше не актуальны
+            self.snapshot.invalidate(wallet.address)
             return tx
         except Exception as e:
             # В случае ошибки освобождаем nonce
@@ -24,10 +58,115 @@ class BaseModule(ABC):
                 self.nonce_manager.release_nonce(wallet.address, tx["nonce"])
             raise e
 
-    def handle_failed_transaction(self, wallet: Wallet, tx: dict):
-        """Обработка неудачной транзакции"""
+    PREFLIGHT_FIELDS = ("from", "to", "value", "data", "gas", "gasPrice", "maxFeePerGas", "maxPriorityFeePerGas")
+    PREFLIGHT_ERRORS = (
+        ("insufficient_funds", ("insufficient funds", "insufficient balance")),
+        ("nonce", ("nonce too low", "nonce too high", "invalid nonce")),
+        ("gas", ("intrinsic gas too low", "out of gas", "gas required exceeds")),
+    )
+
+    @classmethod
+    def classify_preflight_error(cls, error: Exception) -> str:
+        if isinstance(error, ContractLogicError):
+            return "revert"
+        message = str(error).lower()
+        for kind, patterns in cls.PREFLIGHT_ERRORS:
+            if any(pattern in message for pattern in patterns):
+                return kind
+        return "revert" if "revert" in message else "rejected"
+
+    def preflight(self, tx: dict):
+        """
+        Симуляция собранной транзакции через eth_call на pending блоке. Газ и комиссия
+        передаются в вызов, поэтому нехватка баланса после комиссий тоже ловится.
+        """
+        if not SETTINGS["PREFLIGHT"]["ENABLED"]:
+            return
+
+        call = {key: tx[key] for key in self.PREFLIGHT_FIELDS if key in tx}
+        try:
+            get_web3().eth.call(call, "pending")
+        except (ContractLogicError, Web3RPCError, InvalidAddress, ValueError) as e:
+            raise PreflightError(self.classify_preflight_error(e), str(e)) from e
+        except (RequestException, ProviderConnectionError) as e:
+            # Недоступность RPC не означает, что транзакция не пройдет; прочие ошибки (ABI, типы) - пробрасываются
+            logger.debug(f"Preflight skipped for {self.module_name}: {str(e)}")
+
+    def estimate_gas(self, tx: dict, multiplier: float = 1.0) -> int:
+        """
+        Оценка газа - это та же симуляция, что и preflight: ошибка исполнения
+        классифицируется так же, а отдельный eth_call для такой транзакции не нужен
+        """
+        try:
+            return self.tx_builder.estimate_gas(tx, multiplier)
+        except (ContractLogicError, Web3RPCError, InvalidAddress, ValueError) as e:
+            raise PreflightError(self.classify_preflight_error(e), str(e)) from e
+
+    def sign_transaction(self, wallet: Wallet, tx: dict, preflight: bool = True):
+        """
+        Подпись транзакции. preflight=False - газ получен из estimate_gas, симуляция
+        уже выполнена; preflight нужен только при газе извне (константа, API, котировка)
+        """
+        if preflight:
+            self.preflight(tx)
+        return get_signer().sign(wallet, tx)
+
+    def build_contract_transaction(self, wallet: Wallet, contract, function_name: str, args: tuple = (),
+                                   value: int = 0, gas: int = None, gas_multiplier: float = 1.0) -> dict:
+        """
+        Сборка вызова контракта: calldata локально, одна явная оценка газа (если gas не задан)
+        и nonce из NonceManager. Nonce выдается последним - при ошибке оценки он не занимается.
+        """
+        tx = self.tx_builder.build(wallet.address, contract, function_name, args, value=value, gas=gas)
+        if gas is None:
+            tx["gas"] = self.estimate_gas(tx, gas_multiplier)
+        return self.prepare_transaction(wallet, tx)
+
+    def expect_transactions(self, count: int):
+        """Число транзакций текущего запуска, если оно известно только во время выполнения"""
+        if self.journal:
+            self.journal.expect_txs(count)
+
+    def handle_failed_transaction(self, wallet: Wallet, tx: dict, error: Exception = None):
+        """Обработка транзакции, которая не попала в сеть (nonce не израсходован)"""
         if "nonce" in tx:
-            self.nonce_manager.release_nonce(wallet.address, tx["nonce"])
+            self.nonce_manager.handle_error(wallet.address, tx["nonce"], error)
+
+    def get_eth_balance(self, address: str) -> int:
+        """Баланс ETH в wei: сначала из снимка, иначе запрос к RPC"""
+        balance = self.snapshot.get_eth_balance(address)
+        if balance is None:
+            balance = get_web3().eth.get_balance(address)
+        return balance
+
+    def get_token_balance(self, address: str, token_contract) -> int:
+        """Баланс токена в wei: сначала из снимка, иначе balanceOf"""
+        balance = self.snapshot.get_token_balance(address, token_contract.address)
+        if balance is None:
+            balance = token_contract.functions.balanceOf(address).call()
+        return balance
+
+    def wait_for_receipt(self, tx_hash):
+        """Ожидание receipt через общий ReceiptWatcher вместо отдельного polling"""
+        # Хеш попадает в журнал до ожидания: при падении процесса он будет сверен с сетью
+        if self.journal:
+            self.journal.record_tx(tx_hash)
+        receipt = get_receipt_watcher().wait(tx_hash)
+        if self.journal:
+            self.journal.set_tx_status(tx_hash, receipt)
+        return receipt
+
+    def build_transactions(self, wallet: Wallet, destination_chain: Chain, amount: dict,
+                           wallet_number: int) -> Optional[List[dict]]:
+        """
+        Сборка транзакций вызова модуля без nonce и газа для TxPipeline.
+        Модули, которые не переопределяют метод, выполняются через process_transaction.
+        """
+        return None
+
+    @property
+    def supports_pipeline(self) -> bool:
+        return type(self).build_transactions is not BaseModule.build_transactions
 
     @abstractmethod
     def process_transaction(self, wallet: Wallet, destination_chain: Chain, amount: dict, wallet_number: int) -> TransactionResult:
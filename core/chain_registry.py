@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from loguru import logger
+
+from config.settings import SETTINGS
+from core.http_client import get_http_client
+
+
+class ChainRegistry:
+    """
+    Общий индекс chainid.network/chains.json: файл скачивается один раз,
+    хранится на диске и ревалидируется через ETag / If-Modified-Since.
+    """
+
+    def __init__(self):
+        self.settings = SETTINGS["CHAIN_REGISTRY"]
+        self.cache_path = Path(self.settings["CACHE_PATH"])
+        self.meta_path = self.cache_path.with_suffix(".meta.json")
+        self._index: Dict[int, dict] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_meta(self) -> dict:
+        try:
+            return json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _load_from_disk(self) -> bool:
+        try:
+            chains = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        self._index = {chain["chainId"]: chain for chain in chains}
+        return True
+
+    @staticmethod
+    def _write_atomic(path: Path, text: str):
+        """Запись через временный файл: процессы (--processes) не прочитают файл наполовину"""
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(text, encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def _download(self, proxy: dict = None):
+        headers = {}
+        if self.cache_path.exists():
+            meta = self._read_meta()
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = get_http_client().get(self.settings["URL"], proxies=proxy, headers=headers)
+
+        if response.status_code == 304 and self._load_from_disk():
+            logger.debug("Chain registry not modified, using cached copy")
+            return
+
+        response.raise_for_status()
+        chains = response.json()
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(self.cache_path, response.text)
+        self._write_atomic(self.meta_path, json.dumps({
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }))
+
+        self._index = {chain["chainId"]: chain for chain in chains}
+        logger.info(f"Chain registry updated: {len(self._index)} chains")
+
+    def load(self, proxy: dict = None):
+        """Загрузка индекса (не чаще раза в REVALIDATE_INTERVAL)"""
+        if self._index and time.time() - self._checked_at < self.settings["REVALIDATE_INTERVAL"]:
+            return
+
+        with self._lock:
+            if self._index and time.time() - self._checked_at < self.settings["REVALIDATE_INTERVAL"]:
+                return
+            try:
+                self._download(proxy)
+            except Exception as e:
+                if not self._index and not self._load_from_disk():
+                    raise
+                logger.warning(f"Failed to revalidate chain registry, using cached copy: {str(e)}")
+            self._checked_at = time.time()
+
+    def get(self, chain_id: int, proxy: dict = None) -> Optional[dict]:
+        self.load(proxy)
+        return self._index.get(chain_id)
+
+    def get_rpc(self, chain_id: int, proxy: dict = None) -> Optional[str]:
+        chain = self.get(chain_id, proxy)
+        if chain and chain.get("rpc"):
+            return chain["rpc"][0]
+        return None
+
+
+_registry: Optional[ChainRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_chain_registry() -> ChainRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ChainRegistry()
+        return _registry
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from loguru import logger
+
+from config.settings import SETTINGS
+
+# Код выполняется внутри slot(): только такие запросы к RPC влияют на лимит
+_in_slot: ContextVar[bool] = ContextVar("concurrency_in_slot", default=False)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD ограничитель одновременно выполняемых модулей. Лимит растет на 1 за интервал,
+    пока p95 задержки и доля ошибок RPC/API ниже целевых и лимит действительно упирается
+    в нагрузку, и умножается на DECREASE_FACTOR при 429/5xx, таймаутах или превышении целей.
+
+    Учитываются только RPC запросы модулей, выполняемых внутри slot() (движок threads без
+    конвейера). Сторонние API, chains.json, опрос ReceiptWatcher, конвейер и asyncio движок
+    лимитом не ограничены и на него не влияют.
+    """
+
+    def __init__(self):
+        self.settings = SETTINGS["CONCURRENCY"]
+        self.limit = float(self.settings["INITIAL_LIMIT"])
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._latencies = deque(maxlen=self.settings["WINDOW"])
+        self._requests = 0
+        self._errors = 0
+        self._overloads = 0
+        self._saturated = False
+        self._last_adjust = time.monotonic()
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._saturated = True
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        token = _in_slot.set(True)
+        try:
+            yield
+        finally:
+            _in_slot.reset(token)
+            self.release()
+
+    @staticmethod
+    def in_slot() -> bool:
+        return _in_slot.get()
+
+    def record(self, latency: float, error: bool = False, overloaded: bool = False):
+        """
+        Сигнал от HTTP запроса к RPC внутри slot(): overloaded - 429, 5xx или таймаут,
+        error - прочие ошибки соединения.
+        """
+        with self._condition:
+            self._latencies.append(latency)
+            self._requests += 1
+            if error or overloaded:
+                self._errors += 1
+            if overloaded:
+                self._overloads += 1
+            self._adjust()
+
+    def _adjust(self):
+        now = time.monotonic()
+        if now - self._last_adjust < self.settings["ADJUST_INTERVAL"] or not self._requests:
+            return
+
+        latencies = sorted(self._latencies)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        error_rate = self._errors / self._requests
+
+        previous = int(self.limit)
+        if self._overloads or error_rate > self.settings["TARGET_ERROR_RATE"] \
+                or p95 > self.settings["TARGET_P95_LATENCY"]:
+            self.limit = max(float(self.settings["MIN_LIMIT"]), self.limit * self.settings["DECREASE_FACTOR"])
+        elif self._saturated:
+            self.limit = min(float(self.settings["MAX_LIMIT"]), self.limit + 1)
+
+        message = (f"Concurrency limit {previous} -> {int(self.limit)} "
+                   f"(in flight {self._in_flight}, p95 {p95:.2f}s, errors {error_rate:.1%}, "
+                   f"429/5xx/timeouts {self._overloads})")
+        if int(self.limit) != previous:
+            logger.info(message)
+            self._condition.notify_all()
+        else:
+            logger.debug(message)
+
+        self._requests = self._errors = self._overloads = 0
+        self._saturated = False
+        self._last_adjust = now
+
+
+def get_worker_count() -> int:
+    """Число рабочих потоков: при адаптивном лимите - его верхняя граница"""
+    if SETTINGS["CONCURRENCY"]["ENABLED"]:
+        return SETTINGS["CONCURRENCY"]["MAX_LIMIT"]
+    return SETTINGS["MAX_THREADS"]
+
+
+_limiter: Optional[AdaptiveLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_concurrency_limiter() -> Optional[AdaptiveLimiter]:
+    """Общий ограничитель, None если адаптивный лимит отключен в настройках"""
+    global _limiter
+    if not SETTINGS["CONCURRENCY"]["ENABLED"]:
+        return None
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter()
+        return _limiter
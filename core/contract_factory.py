@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, Tuple, Type, Union
+
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector
+from web3 import Web3
+
+from core.provider_registry import get_web3
+from utils.address import to_checksum
+
+
+@dataclass(frozen=True)
+class ParsedAbi:
+    abi: tuple
+    hash: str
+    selectors: Dict[str, str]  # имя функции -> 0x селектор (для перегрузок - последняя)
+    topics: Dict[str, str]  # имя события -> 0x topic0
+
+
+class ContractFactory:
+    """
+    Фабрика контрактов на процесс: каждый ABI разбирается один раз, селекторы функций
+    и topic событий считаются заранее, а объекты контрактов кэшируются по (адрес, хэш ABI).
+    Модули берут контракты отсюда вместо w3.eth.contract на каждый вызов.
+    """
+
+    # Разобранные ABI общие для всех фабрик: ключ - id исходного объекта (строки или списка)
+    _abis: Dict[int, Tuple[Union[str, list], ParsedAbi]] = {}
+    _abis_lock = threading.Lock()
+
+    def __init__(self, w3: Web3):
+        self.w3 = w3
+        self._classes: Dict[str, Type] = {}
+        self._contracts: Dict[Tuple[str, str], object] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse_abi(cls, abi: Union[str, list]) -> ParsedAbi:
+        cached = cls._abis.get(id(abi))
+        # Исходный объект хранится в кэше, поэтому его id не переиспользуется
+        if cached is not None and cached[0] is abi:
+            return cached[1]
+
+        abi_list = json.loads(abi) if isinstance(abi, str) else abi
+        abi_hash = hashlib.sha256(json.dumps(abi_list, sort_keys=True).encode()).hexdigest()
+        selectors = {
+            entry["name"]: "0x" + function_abi_to_4byte_selector(entry).hex()
+            for entry in abi_list if entry.get("type") == "function"
+        }
+        topics = {
+            entry["name"]: "0x" + event_abi_to_log_topic(entry).hex()
+            for entry in abi_list if entry.get("type") == "event"
+        }
+        parsed = ParsedAbi(tuple(abi_list), abi_hash, selectors, topics)
+
+        with cls._abis_lock:
+            cls._abis[id(abi)] = (abi, parsed)
+        return parsed
+
+    def get_contract(self, address: str, abi: Union[str, list]):
+        parsed = self.parse_abi(abi)
+        key = (address.lower(), parsed.hash)
+        contract = self._contracts.get(key)
+        if contract is not None:
+            return contract
+
+        with self._lock:
+            if key not in self._contracts:
+                # Класс контракта (функции и события по ABI) строится один раз на ABI
+                contract_class = self._classes.get(parsed.hash)
+                if contract_class is None:
+                    contract_class = self._classes[parsed.hash] = self.w3.eth.contract(abi=list(parsed.abi))
+                self._contracts[key] = contract_class(address=to_checksum(address))
+            return self._contracts[key]
+
+    def selector(self, abi: Union[str, list], function_name: str) -> str:
+        return self.parse_abi(abi).selectors[function_name]
+
+    def topic(self, abi: Union[str, list], event_name: str) -> str:
+        return self.parse_abi(abi).topics[event_name]
+
+
+_factories: Dict[int, ContractFactory] = {}
+_factories_lock = threading.Lock()
+
+
+def get_contract_factory(w3=None) -> ContractFactory:
+    """Фабрика для экземпляра Web3/AsyncWeb3 (по умолчанию - общий Web3 основного RPC)"""
+    if w3 is None:
+        w3 = get_web3()
+    with _factories_lock:
+        factory = _factories.get(id(w3))
+        if factory is None or factory.w3 is not w3:
+            factory = _factories[id(w3)] = ContractFactory(w3)
+        return factory
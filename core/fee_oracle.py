@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+from web3 import Web3
+
+from config.settings import SETTINGS
+from core.provider_registry import get_web3, make_batch_request
+
+
+class FeeOracle:
+    """
+    Общий кэш цены газа: eth_gasPrice и eth_feeHistory обновляются одним batch-запросом
+    не чаще раза в TTL (по умолчанию - время блока), все потоки получают одинаковые значения.
+    """
+
+    def __init__(self, w3: Web3):
+        self.w3 = w3
+        self.settings = SETTINGS["FEE_ORACLE"]
+        self._lock = threading.Lock()
+        self._updated_at = 0.0
+        self._gas_price: Optional[int] = None
+        self._base_fee: Optional[int] = None
+        self._priority_fee: Optional[int] = None
+
+    def _refresh(self):
+        gas_price, fee_history = make_batch_request(self.w3, [
+            ("eth_gasPrice", []),
+            ("eth_feeHistory", [self.settings["HISTORY_BLOCKS"], "latest", [self.settings["PRIORITY_PERCENTILE"]]]),
+        ])
+
+        if gas_price is None:
+            raise ValueError("eth_gasPrice returned no result")
+        self._gas_price = int(gas_price, 16)
+
+        if fee_history and fee_history.get("baseFeePerGas"):
+            # Последний элемент baseFeePerGas - base fee следующего блока
+            self._base_fee = int(fee_history["baseFeePerGas"][-1], 16)
+            rewards = [int(reward[0], 16) for reward in fee_history.get("reward") or [] if reward]
+            self._priority_fee = sorted(rewards)[len(rewards) // 2] if rewards else 0
+        else:
+            self._base_fee = None
+            self._priority_fee = None
+
+        self._updated_at = time.time()
+
+    def _ensure_fresh(self):
+        if time.time() - self._updated_at < self.settings["TTL"]:
+            return
+
+        with self._lock:
+            if time.time() - self._updated_at < self.settings["TTL"]:
+                return
+            try:
+                self._refresh()
+            except Exception as e:
+                if self._gas_price is None:
+                    raise
+                logger.warning(f"Failed to refresh gas price, using cached value: {str(e)}")
+
+    def gas_price(self) -> int:
+        """Legacy gas price"""
+        self._ensure_fresh()
+        return self._gas_price
+
+    def eip1559_fees(self) -> Dict[str, int]:
+        """maxFeePerGas / maxPriorityFeePerGas на основе eth_feeHistory"""
+        self._ensure_fresh()
+        if self._base_fee is None:
+            raise ValueError("Network does not support EIP-1559 fees")
+
+        priority_fee = self._priority_fee
+        return {
+            "maxFeePerGas": self._base_fee * self.settings["BASE_FEE_MULTIPLIER"] + priority_fee,
+            "maxPriorityFeePerGas": priority_fee,
+        }
+
+    def get_fee_fields(self) -> Dict[str, int]:
+        """Поля комиссии для транзакции в зависимости от настроенного режима"""
+        if self.settings["MODE"] == "eip1559":
+            try:
+                return self.eip1559_fees()
+            except ValueError:
+                pass
+        return {"gasPrice": self.gas_price()}
+
+
+_oracles: Dict[str, FeeOracle] = {}
+_oracles_lock = threading.Lock()
+
+
+def get_fee_oracle(rpc_url: Optional[str] = None) -> FeeOracle:
+    """Общий FeeOracle для RPC URL (по умолчанию SETTINGS['RPC_URL'])"""
+    rpc_url = rpc_url or SETTINGS["RPC_URL"]
+    with _oracles_lock:
+        if rpc_url not in _oracles:
+            _oracles[rpc_url] = FeeOracle(get_web3(rpc_url))
+        return _oracles[rpc_url]
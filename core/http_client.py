@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from loguru import logger
+
+from config.settings import SETTINGS
+from core.concurrency_limiter import get_worker_count
+from core.provider_registry import PooledHTTPAdapter
+
+
+class HttpClient:
+    """
+    Общий HTTP клиент для внешних API: ограниченный пул keep-alive сессий
+    по ключу (прокси, хост). Повторные запросы квот и статусов идут по уже
+    открытым соединениям вместо нового TCP+TLS на каждый вызов.
+    """
+
+    def __init__(self):
+        self.settings = SETTINGS["HTTP_CLIENT"]
+        self._sessions: "OrderedDict[Tuple[Optional[str], str], requests.Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _session_key(url: str, proxies: Optional[dict]) -> Tuple[Optional[str], str]:
+        proxy_url = None
+        if proxies:
+            proxy_url = proxies.get("https") or proxies.get("http")
+        return proxy_url, urlsplit(url).netloc
+
+    def _create_session(self, proxies: Optional[dict]) -> requests.Session:
+        pool_size = get_worker_count()
+        adapter = PooledHTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if proxies:
+            session.proxies.update(proxies)
+        return session
+
+    def get_session(self, url: str, proxies: Optional[dict] = None) -> requests.Session:
+        key = self._session_key(url, proxies)
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+
+            session = self._create_session(proxies)
+            self._sessions[key] = session
+
+            # Самые давно неиспользуемые сессии закрываются
+            while len(self._sessions) > self.settings["MAX_SESSIONS"]:
+                evicted_key, evicted = self._sessions.popitem(last=False)
+                evicted.close()
+                logger.debug(f"HTTP session evicted: {evicted_key[1]}")
+
+            return session
+
+    def request(self, method: str, url: str, proxies: Optional[dict] = None, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.settings["TIMEOUT"])
+        session = self.get_session(url, proxies)
+        return session.request(method, url, **kwargs)
+
+    def get(self, url: str, proxies: Optional[dict] = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, proxies=proxies, **kwargs)
+
+    def post(self, url: str, proxies: Optional[dict] = None, **kwargs) -> requests.Response:
+        return self.request("POST", url, proxies=proxies, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
@@ -0,0 +1,229 @@
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+from hexbytes import HexBytes
+from loguru import logger
+from web3 import Web3
+
+from config.settings import SETTINGS
+from core.provider_registry import make_batch_request
+from core.receipt_watcher import get_receipt_watcher
+from core.wallet_manager import TransactionResult
+
+# Запуск модуля, в рамках которого сейчас выполняется код (поток или asyncio задача)
+current_run_id: ContextVar[Optional[int]] = ContextVar("current_run_id", default=None)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    address TEXT PRIMARY KEY,
+    contracts_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS module_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    address TEXT NOT NULL,
+    module_name TEXT NOT NULL,
+    chain_id INTEGER,
+    status TEXT NOT NULL,
+    tx_hash TEXT,
+    error_message TEXT,
+    expected_txs INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS module_runs_address ON module_runs (address);
+CREATE TABLE IF NOT EXISTS transactions (
+    tx_hash TEXT PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_run ON transactions (run_id);
+"""
+
+
+class JobJournal:
+    """
+    Журнал выполнения в SQLite: план кошельков, запуски модулей и отправленные
+    хеши со статусами. При --resume незавершенные хеши сверяются с сетью, и
+    выполняется только оставшаяся работа, без повторной оплаты газа.
+
+    Статусы запуска: running, success, failed. Статусы транзакции: pending, success, reverted.
+    expected_txs - сколько транзакций должен отправить запуск (NULL - неизвестно).
+    """
+
+    FINISHED = ("success", "failed")
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # timeout: в режиме --processes в журнал пишут несколько процессов
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(module_runs)")]
+        if "expected_txs" not in columns:
+            # Журнал от предыдущей версии
+            self._conn.execute("ALTER TABLE module_runs ADD COLUMN expected_txs INTEGER")
+        self._lock = threading.Lock()
+
+    def _execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(query, params)
+
+    def _fetchall(self, query: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    @staticmethod
+    def _key(address: str) -> str:
+        return address.lower()
+
+    def reset(self):
+        """Новый запуск без --resume: прошлый журнал больше не нужен"""
+        with self._lock:
+            self._conn.executescript("DELETE FROM wallets; DELETE FROM module_runs; DELETE FROM transactions;")
+
+    def plan_wallet(self, address: str, contracts_count: int):
+        self._execute(
+            "INSERT OR IGNORE INTO wallets (address, contracts_count) VALUES (?, ?)",
+            (self._key(address), contracts_count)
+        )
+
+    def finished_runs(self, address: str) -> int:
+        """Сколько запусков модулей кошелька уже завершено (успешно или с ошибкой)"""
+        rows = self._fetchall(
+            "SELECT COUNT(*) FROM module_runs WHERE address = ? AND status IN (?, ?)",
+            (self._key(address), *self.FINISHED)
+        )
+        return rows[0][0]
+
+    def begin_run(self, address: str, module_name: str, chain_id: int, expected_txs: Optional[int] = None) -> int:
+        cursor = self._execute(
+            "INSERT INTO module_runs (address, module_name, chain_id, status, expected_txs, updated_at) "
+            "VALUES (?, ?, ?, 'running', ?, ?)",
+            (self._key(address), module_name, chain_id, expected_txs, time.time())
+        )
+        return cursor.lastrowid
+
+    def expect_txs(self, count: int, run_id: Optional[int] = None):
+        """Число транзакций запуска, известное только во время выполнения модуля"""
+        run_id = run_id if run_id is not None else current_run_id.get()
+        if run_id is None:
+            return
+        self._execute("UPDATE module_runs SET expected_txs = ? WHERE id = ?", (count, run_id))
+
+    def finish_run(self, run_id: int, result: TransactionResult):
+        self._execute(
+            "UPDATE module_runs SET status = ?, tx_hash = ?, error_message = ?, updated_at = ? WHERE id = ?",
+            ("success" if result.success else "failed", result.tx_hash, result.error_message, time.time(), run_id)
+        )
+
+    def record_tx(self, tx_hash, run_id: Optional[int] = None):
+        """Хеш отправленной транзакции (до ожидания receipt)"""
+        run_id = run_id if run_id is not None else current_run_id.get()
+        if run_id is None:
+            return
+        self._execute(
+            "INSERT OR REPLACE INTO transactions (tx_hash, run_id, status, updated_at) VALUES (?, ?, 'pending', ?)",
+            (HexBytes(tx_hash).to_0x_hex(), run_id, time.time())
+        )
+
+    def set_tx_status(self, tx_hash, receipt):
+        self._execute(
+            "UPDATE transactions SET status = ?, updated_at = ? WHERE tx_hash = ?",
+            ("success" if receipt["status"] == 1 else "reverted", time.time(), HexBytes(tx_hash).to_0x_hex())
+        )
+
+    def reconcile(self, w3: Web3):
+        """
+        Сверка с сетью после перезапуска: статусы висящих хешей берутся из receipt,
+        прерванные запуски модулей закрываются по своим транзакциям или удаляются
+        (тогда модуль будет выполнен заново). Успешным запуск считается, только если
+        подтверждены все expected_txs транзакций; частично отправленный запуск
+        закрывается как failed, чтобы не повторять уже оплаченные транзакции.
+        """
+        pending = [row[0] for row in self._fetchall("SELECT tx_hash FROM transactions WHERE status = 'pending'")]
+        batch_size = SETTINGS["SNAPSHOT"]["RPC_BATCH_SIZE"]
+
+        in_mempool = []
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            receipts = make_batch_request(w3, [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in chunk])
+            missing = [tx_hash for tx_hash, receipt in zip(chunk, receipts) if receipt is None]
+            transactions = make_batch_request(w3, [("eth_getTransactionByHash", [tx_hash]) for tx_hash in missing])
+
+            for tx_hash, receipt in zip(chunk, receipts):
+                if receipt is not None:
+                    self.set_tx_status(tx_hash, {"status": int(receipt["status"], 16)})
+            for tx_hash, transaction in zip(missing, transactions):
+                if transaction is not None:
+                    in_mempool.append(tx_hash)
+                else:
+                    # Транзакция не попала в сеть - nonce свободен, NonceManager возьмет его из сети
+                    self._execute("DELETE FROM transactions WHERE tx_hash = ?", (tx_hash,))
+
+        # Транзакции, которые еще в mempool, дожидаемся, иначе модуль отправит их повторно
+        watcher = get_receipt_watcher()
+        futures = [(tx_hash, watcher.watch(tx_hash)) for tx_hash in in_mempool]
+        for tx_hash, future in futures:
+            try:
+                self.set_tx_status(tx_hash, future.result())
+            except Exception as e:
+                logger.warning(f"Transaction {tx_hash} is still pending after restart: {str(e)}")
+
+        interrupted = self._fetchall("SELECT id, expected_txs FROM module_runs WHERE status = 'running'")
+        completed = 0
+        for run_id, expected_txs in interrupted:
+            statuses = [row[0] for row in self._fetchall(
+                "SELECT status FROM transactions WHERE run_id = ?", (run_id,)
+            )]
+            if "reverted" in statuses or "pending" in statuses:
+                # Газ потрачен или транзакция еще может попасть в блок - повторять нельзя
+                error_message = "Transaction failed" if "reverted" in statuses else "Transaction is still pending"
+                self._execute(
+                    "UPDATE module_runs SET status = 'failed', error_message = ?, updated_at = ? WHERE id = ?",
+                    (error_message, time.time(), run_id)
+                )
+                completed += 1
+            elif statuses and expected_txs is not None and len(statuses) >= expected_txs:
+                self._execute(
+                    "UPDATE module_runs SET status = 'success', updated_at = ? WHERE id = ?", (time.time(), run_id)
+                )
+                completed += 1
+            elif statuses:
+                # Часть транзакций подтверждена, остальные не отправлены (или их число неизвестно)
+                self._execute(
+                    "UPDATE module_runs SET status = 'failed', error_message = ?, updated_at = ? WHERE id = ?",
+                    ("Interrupted before all transactions were sent", time.time(), run_id)
+                )
+                completed += 1
+            else:
+                self._execute("DELETE FROM transactions WHERE run_id = ?", (run_id,))
+                self._execute("DELETE FROM module_runs WHERE id = ?", (run_id,))
+
+        logger.info(
+            f"Journal reconciled: {len(pending)} pending transactions, "
+            f"{completed}/{len(interrupted)} interrupted module runs closed"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_journal: Optional[JobJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_job_journal() -> Optional[JobJournal]:
+    """Общий журнал выполнения, None если журнал отключен в настройках"""
+    global _journal
+    if not SETTINGS["JOURNAL"]["ENABLED"]:
+        return None
+    with _journal_lock:
+        if _journal is None:
+            _journal = JobJournal(SETTINGS["JOURNAL"]["PATH"])
+        return _journal
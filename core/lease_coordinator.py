@@ -0,0 +1,268 @@
+import json
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from config.settings import SETTINGS
+from core.http_client import get_http_client
+from core.wallet_manager import Wallet, Chain, TransactionResult
+from utils.results_tracker import ResultsTracker
+
+
+@dataclass
+class Lease:
+    worker: str
+    expires_at: float
+
+
+class LeaseCoordinator:
+    """
+    Координатор нескольких хостов: выдает кошельки воркерам в аренду с истечением.
+    Воркер продлевает аренду heartbeat-ом; если он пропал, кошелек возвращается
+    в очередь и достается другому хосту. Результаты воркеров пишутся в единый results.xlsx,
+    а число выполненных модулей кошелька выдается вместе с арендой, чтобы новый воркер
+    продолжил с того же места. Приватные ключи по сети не передаются - воркеры читают
+    тот же файл кошельков.
+    """
+
+    def __init__(self, wallets: Iterable[Wallet], results_tracker: ResultsTracker):
+        self.settings = SETTINGS["COORDINATOR"]
+        self.results_tracker = results_tracker
+        self._pending: List[str] = [wallet.address.lower() for wallet in wallets]
+        self._leases: Dict[str, Lease] = {}
+        self._done: set = set()
+        # Выполненные модули по кошелькам (по отчетам /result)
+        self._progress: Dict[str, int] = {}
+        # Воркеры, обращавшиеся к координатору, и те, кто уже получил finished
+        self._workers: set = set()
+        self._checked_out: set = set()
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+
+    def _expire_leases(self):
+        now = time.time()
+        expired = [address for address, lease in self._leases.items() if lease.expires_at <= now]
+        for address in expired:
+            lease = self._leases.pop(address)
+            # В начало очереди: кошелек уже начат и должен быть завершен первым
+            self._pending.insert(0, address)
+            logger.warning(f"Lease of {address} by worker {lease.worker} expired, wallet returned to queue")
+
+    def claim(self, worker: str, count: int) -> dict:
+        with self._lock:
+            self._expire_leases()
+            claimed = self._pending[:count]
+            del self._pending[:count]
+
+            expires_at = time.time() + self.settings["LEASE_TTL"]
+            for address in claimed:
+                self._leases[address] = Lease(worker, expires_at)
+
+            if claimed:
+                logger.info(f"Worker {worker} claimed {len(claimed)} wallets "
+                            f"({len(self._pending)} pending, {len(self._done)} done)")
+            finished = not self._pending and not self._leases
+            if finished:
+                self._checked_out.add(worker)
+            return {
+                "wallets": claimed,
+                "progress": {address: self._progress.get(address, 0) for address in claimed},
+                "finished": finished
+            }
+
+    def heartbeat(self, worker: str, addresses: List[str]) -> dict:
+        """Продление аренд воркера; lost - кошельки, которые он больше не держит"""
+        with self._lock:
+            self._expire_leases()
+            expires_at = time.time() + self.settings["LEASE_TTL"]
+            leases = [lease for lease in self._leases.values() if lease.worker == worker]
+            for lease in leases:
+                lease.expires_at = expires_at
+
+            lost = []
+            for address in addresses:
+                lease = self._leases.get(address.lower())
+                if lease is None or lease.worker != worker:
+                    lost.append(address.lower())
+            if lost:
+                logger.warning(f"Worker {worker} lost {len(lost)} wallets (leases expired or completed elsewhere)")
+            return {"leases": len(leases), "lost": lost}
+
+    def report_result(self, worker: str, address: str, chain: dict, result: dict) -> dict:
+        with self._lock:
+            lease = self._leases.get(address.lower())
+            if lease is None or lease.worker != worker:
+                # Аренда истекла - результат все равно записываем, транзакция уже отправлена
+                logger.warning(f"Result for {address} from worker {worker} without active lease")
+            self._progress[address.lower()] = self._progress.get(address.lower(), 0) + 1
+        self.results_tracker.update_results(
+            Wallet(address=address, private_key=""), Chain(**chain), TransactionResult(**result)
+        )
+        return {}
+
+    def complete(self, worker: str, address: str) -> dict:
+        address = address.lower()
+        with self._lock:
+            # Кошелек завершен - аренда снимается, кому бы она ни принадлежала:
+            # текущий арендатор узнает об этом из heartbeat и остановит кошелек
+            lease = self._leases.pop(address, None)
+            if lease is not None and lease.worker != worker:
+                logger.warning(f"Wallet {address} completed by {worker} while leased to {lease.worker}")
+            if address in self._pending:
+                self._pending.remove(address)
+            self._done.add(address)
+
+            if not self._pending and not self._leases:
+                self._finished.set()
+        return {}
+
+    def handle(self, path: str, payload: dict) -> Optional[dict]:
+        worker = payload.get("worker", "")
+        with self._lock:
+            self._workers.add(worker)
+        if path == "/claim":
+            return self.claim(worker, int(payload.get("count", 1)))
+        if path == "/heartbeat":
+            return self.heartbeat(worker, payload.get("addresses", []))
+        if path == "/result":
+            return self.report_result(worker, payload["address"], payload["chain"], payload["result"])
+        if path == "/complete":
+            return self.complete(worker, payload["address"])
+        return None
+
+    def _all_checked_out(self) -> bool:
+        with self._lock:
+            return self._workers <= self._checked_out
+
+    def serve(self):
+        """
+        HTTP сервис координатора, работает до завершения всех кошельков. После этого
+        еще отвечает finished, пока все воркеры не заберут его или не пройдет FINISH_GRACE.
+        """
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                    response = coordinator.handle(self.path, payload)
+                    status = 200 if response is not None else 404
+                except Exception as e:
+                    logger.error(f"Coordinator request error: {str(e)}")
+                    response, status = {"error": str(e)}, 400
+
+                body = json.dumps(response or {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((self.settings["HOST"], self.settings["PORT"]), Handler)
+        thread = threading.Thread(target=server.serve_forever, name="Coordinator", daemon=True)
+        thread.start()
+        logger.info(f"Coordinator listening on {self.settings['HOST']}:{self.settings['PORT']} "
+                    f"with {len(self._pending)} wallets")
+
+        with self._lock:
+            if not self._pending and not self._leases:
+                self._finished.set()
+        try:
+            while not self._finished.wait(self.settings["HEARTBEAT_INTERVAL"]):
+                with self._lock:
+                    self._expire_leases()
+
+            deadline = time.time() + self.settings["FINISH_GRACE"]
+            while not self._all_checked_out() and time.time() < deadline:
+                time.sleep(1)
+        finally:
+            server.shutdown()
+            self.results_tracker.save_results()
+        logger.info(f"All {len(self._done)} wallets processed")
+
+
+class LeaseClient:
+    """Клиент воркера (--worker): аренда кошельков, heartbeat и отчеты координатору"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.worker = f"{uuid.uuid4().hex[:8]}"
+        self.settings = SETTINGS["COORDINATOR"]
+        self.http = get_http_client()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._held: set = set()
+        self._lost: set = set()
+        # Выполненные модули кошельков по данным координатора (в том числе другими воркерами)
+        self._progress: Dict[str, int] = {}
+        self._held_lock = threading.Lock()
+
+    def _post(self, path: str, payload: dict) -> dict:
+        response = self.http.post(f"{self.url}{path}", json={"worker": self.worker, **payload})
+        response.raise_for_status()
+        return response.json()
+
+    def claim(self, count: int) -> dict:
+        claim = self._post("/claim", {"count": count})
+        with self._held_lock:
+            self._held.update(claim["wallets"])
+            self._lost.difference_update(claim["wallets"])
+            self._progress.update(claim.get("progress", {}))
+        return claim
+
+    def processed_count(self, address: str) -> int:
+        """Сколько модулей кошелька уже выполнено по данным координатора"""
+        with self._held_lock:
+            return self._progress.get(address.lower(), 0)
+
+    def complete(self, address: str):
+        with self._held_lock:
+            self._held.discard(address.lower())
+        self._post("/complete", {"address": address})
+
+    def is_lost(self, address: str) -> bool:
+        """Аренда кошелька истекла или он завершен другим воркером - продолжать нельзя"""
+        with self._held_lock:
+            return address.lower() in self._lost
+
+    def release(self, address: str):
+        """Потерянный кошелек остановлен, координатору о нем не сообщаем"""
+        with self._held_lock:
+            self._held.discard(address.lower())
+
+    def update_results(self, wallet: Wallet, chain: Chain, result: TransactionResult):
+        """Интерфейс ResultsTracker: результат уходит координатору"""
+        try:
+            self._post("/result", {"address": wallet.address, "chain": asdict(chain), "result": asdict(result)})
+        except Exception as e:
+            logger.error(f"Failed to report result for {wallet.address}: {str(e)}")
+
+    def start_heartbeat(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._heartbeat, name="LeaseHeartbeat", daemon=True)
+        self._thread.start()
+
+    def stop_heartbeat(self):
+        self._stop_event.set()
+
+    def _heartbeat(self):
+        while not self._stop_event.wait(self.settings["HEARTBEAT_INTERVAL"]):
+            try:
+                with self._held_lock:
+                    addresses = list(self._held)
+                response = self._post("/heartbeat", {"addresses": addresses})
+                with self._held_lock:
+                    for address in response.get("lost", []):
+                        self._held.discard(address)
+                        self._lost.add(address)
+            except Exception as e:
+                logger.warning(f"Coordinator heartbeat failed: {str(e)}")
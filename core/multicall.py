@@ -0,0 +1,118 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from eth_utils.abi import get_abi_output_types
+from loguru import logger
+from web3 import Web3
+
+from config.settings import SETTINGS
+from core.contract_factory import get_contract_factory
+from core.provider_registry import get_web3
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [{"name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+@dataclass
+class ContractCall:
+    contract: Any
+    function_name: str
+    args: tuple = field(default_factory=tuple)
+
+
+@dataclass
+class CallResult:
+    success: bool
+    value: Any = None
+
+
+class Multicall:
+    """Пакетное чтение контрактов: произвольные (contract, function, args) в один eth_call aggregate3"""
+
+    def __init__(self, w3: Web3):
+        self.w3 = w3
+        self.batch_size = SETTINGS["MULTICALL"]["BATCH_SIZE"]
+        self.contract = get_contract_factory(w3).get_contract(MULTICALL3_ADDRESS, MULTICALL3_ABI)
+
+    def eth_balance_call(self, address: str) -> ContractCall:
+        """Чтение ETH баланса внутри того же батча"""
+        return ContractCall(self.contract, "getEthBalance", (address,))
+
+    def _decode(self, call: ContractCall, success: bool, return_data: bytes) -> CallResult:
+        if not success or not return_data:
+            return CallResult(success=False)
+
+        output_types = get_abi_output_types(call.contract.get_function_by_name(call.function_name).abi)
+        try:
+            values = self.w3.codec.decode(output_types, return_data)
+        except Exception as e:
+            logger.debug(f"Failed to decode {call.function_name} result: {str(e)}")
+            return CallResult(success=False)
+
+        return CallResult(success=True, value=values[0] if len(values) == 1 else values)
+
+    def call(self, calls: List[ContractCall], block_identifier: Optional[str] = "latest") -> List[CallResult]:
+        """Выполнение батча, результаты в порядке вызовов с флагом успеха для каждого"""
+        results: List[CallResult] = []
+
+        for start in range(0, len(calls), self.batch_size):
+            chunk = calls[start:start + self.batch_size]
+            encoded = [
+                (call.contract.address, True, call.contract.encode_abi(call.function_name, list(call.args)))
+                for call in chunk
+            ]
+            responses = self.contract.functions.aggregate3(encoded).call(block_identifier=block_identifier)
+            results.extend(
+                self._decode(call, success, return_data)
+                for call, (success, return_data) in zip(chunk, responses)
+            )
+
+        return results
+
+
+_multicalls: Dict[str, Multicall] = {}
+_multicalls_lock = threading.Lock()
+
+
+def get_multicall(rpc_url: Optional[str] = None) -> Multicall:
+    """Общий Multicall для RPC URL (по умолчанию SETTINGS['RPC_URL'])"""
+    rpc_url = rpc_url or SETTINGS["RPC_URL"]
+    with _multicalls_lock:
+        if rpc_url not in _multicalls:
+            _multicalls[rpc_url] = Multicall(get_web3(rpc_url))
+        return _multicalls[rpc_url]
@@ -0,0 +1,92 @@
+import heapq
+import threading
+from typing import Dict, List
+
+from loguru import logger
+from web3 import Web3
+
+from utils.address import to_checksum
+
+
+class NonceManager:
+    """
+    Локальная выдача nonce: pending count запрашивается один раз на адрес,
+    дальше nonce выдаются из памяти. Освобожденные nonce переиспользуются
+    первыми, чтобы не оставлять дыр в последовательности.
+    """
+
+    STRIPES = 64
+    NONCE_TOO_LOW_ERRORS = ("nonce too low", "nonce is too low", "invalid nonce", "already known")
+
+    def __init__(self, w3: Web3):
+        self.w3 = w3
+        # Полосатые блокировки: кошельки из разных полос не блокируют друг друга
+        self._locks = [threading.Lock() for _ in range(self.STRIPES)]
+        self._next_nonce: Dict[str, int] = {}
+        self._released: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _key(address: str) -> str:
+        return address.lower()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % self.STRIPES]
+
+    def _fetch_pending_count(self, address: str) -> int:
+        return self.w3.eth.get_transaction_count(to_checksum(address), "pending")
+
+    def get_next_nonce(self, address: str) -> int:
+        """Выдача следующего nonce для адреса"""
+        key = self._key(address)
+        with self._lock_for(key):
+            if key not in self._next_nonce:
+                self._next_nonce[key] = self._fetch_pending_count(address)
+                self._released[key] = []
+
+            released = self._released[key]
+            if released:
+                return heapq.heappop(released)
+
+            nonce = self._next_nonce[key]
+            self._next_nonce[key] = nonce + 1
+            return nonce
+
+    def release_nonce(self, address: str, nonce: int):
+        """Возврат неиспользованного nonce (транзакция не была отправлена)"""
+        key = self._key(address)
+        with self._lock_for(key):
+            if key not in self._next_nonce or nonce >= self._next_nonce[key]:
+                return
+
+            released = self._released[key]
+            if nonce in released:
+                return
+
+            heapq.heappush(released, nonce)
+
+            # Если освобожден хвост последовательности, просто откатываем счетчик
+            while released and self._next_nonce[key] - 1 in released:
+                released.remove(self._next_nonce[key] - 1)
+                self._next_nonce[key] -= 1
+            heapq.heapify(released)
+
+    def resync(self, address: str):
+        """Повторная синхронизация с сетью (например, после ошибки 'nonce too low')"""
+        key = self._key(address)
+        with self._lock_for(key):
+            pending_count = self._fetch_pending_count(address)
+            self._next_nonce[key] = pending_count
+            self._released[key] = []
+            logger.debug(f"Nonce for {address} resynced to {pending_count}")
+
+    @classmethod
+    def is_nonce_too_low(cls, error: Exception) -> bool:
+        message = str(error).lower()
+        return any(text in message for text in cls.NONCE_TOO_LOW_ERRORS)
+
+    def handle_error(self, address: str, nonce: int, error: Exception = None):
+        """Обработка ошибки отправки: ресинк при рассинхронизации, иначе возврат nonce"""
+        if error is not None and self.is_nonce_too_low(error):
+            self.resync(address)
+        else:
+            self.release_nonce(address, nonce)
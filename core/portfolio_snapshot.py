@@ -0,0 +1,144 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from loguru import logger
+from web3 import Web3
+
+from config.constants import ERC20_ABI, WETH_ADDRESS
+from config.settings import SETTINGS
+from core.contract_factory import get_contract_factory
+from core.multicall import ContractCall, get_multicall
+from core.provider_registry import get_web3, make_batch_request
+from core.wallet_manager import Wallet
+from utils.address import to_checksum
+
+
+@dataclass
+class WalletBalances:
+    eth: int
+    tokens: Dict[str, int] = field(default_factory=dict)  # адрес токена (lower) -> баланс в wei
+
+
+class PortfolioSnapshot:
+    """
+    Снимок балансов всех кошельков перед запуском: ETH через JSON-RPC batch,
+    WETH и токены Ionic через multicall. Модули сначала читают балансы отсюда;
+    после отправки транзакции запись кошелька считается устаревшей.
+    """
+
+    def __init__(self, w3: Web3):
+        self.w3 = w3
+        self.settings = SETTINGS["SNAPSHOT"]
+        self._balances: Dict[str, WalletBalances] = {}
+        self._decimals: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_token_addresses() -> Dict[str, str]:
+        tokens = {"WETH": WETH_ADDRESS}
+        for symbol, token_data in SETTINGS["IONIC"]["TOKENS"].items():
+            tokens[symbol] = token_data["ADDRESS"]
+        return tokens
+
+    def _fetch_eth_balances(self, addresses: List[str]) -> Dict[str, int]:
+        balances = {}
+        batch_size = self.settings["RPC_BATCH_SIZE"]
+
+        for start in range(0, len(addresses), batch_size):
+            chunk = addresses[start:start + batch_size]
+            results = make_batch_request(self.w3, [("eth_getBalance", [address, "latest"]) for address in chunk])
+            for address, result in zip(chunk, results):
+                if result is not None:
+                    balances[address] = int(result, 16)
+
+        return balances
+
+    def _fetch_token_balances(self, addresses: List[str]) -> Dict[str, Dict[str, int]]:
+        multicall = get_multicall()
+        contracts = [
+            get_contract_factory(self.w3).get_contract(token_address, ERC20_ABI)
+            for token_address in self.get_token_addresses().values()
+        ]
+
+        # decimals неизменны, читаются один раз на токен
+        decimals_results = multicall.call([ContractCall(contract, "decimals") for contract in contracts])
+        for contract, result in zip(contracts, decimals_results):
+            if result.success:
+                self._decimals[contract.address.lower()] = result.value
+
+        calls = [
+            ContractCall(contract, "balanceOf", (address,))
+            for address in addresses
+            for contract in contracts
+        ]
+        results = multicall.call(calls)
+
+        balances: Dict[str, Dict[str, int]] = {}
+        for call, result in zip(calls, results):
+            if result.success:
+                balances.setdefault(call.args[0], {})[call.contract.address.lower()] = result.value
+
+        return balances
+
+    def build(self, wallets: List[Wallet]):
+        addresses = list(dict.fromkeys(to_checksum(wallet.address) for wallet in wallets))
+        logger.info(f"Building balance snapshot for {len(addresses)} wallets")
+
+        eth_balances = self._fetch_eth_balances(addresses)
+        token_balances = self._fetch_token_balances(addresses)
+
+        with self._lock:
+            for address in addresses:
+                if address not in eth_balances:
+                    continue
+                self._balances[address.lower()] = WalletBalances(
+                    eth=eth_balances[address],
+                    tokens=token_balances.get(address, {})
+                )
+
+        logger.info(f"Balance snapshot ready: {len(self._balances)}/{len(addresses)} wallets")
+
+    def get(self, address: str) -> Optional[WalletBalances]:
+        with self._lock:
+            return self._balances.get(address.lower())
+
+    def get_eth_balance(self, address: str) -> Optional[int]:
+        balances = self.get(address)
+        return balances.eth if balances else None
+
+    def get_token_balance(self, address: str, token_address: str) -> Optional[int]:
+        balances = self.get(address)
+        if balances is None:
+            return None
+        return balances.tokens.get(token_address.lower())
+
+    def get_token_decimals(self, token_address: str) -> Optional[int]:
+        return self._decimals.get(token_address.lower())
+
+    def invalidate(self, address: str):
+        """Кошелек отправил транзакцию - данные снимка для него больше не актуальны"""
+        with self._lock:
+            self._balances.pop(address.lower(), None)
+
+    def can_afford_any_module(self, wallet: Wallet) -> bool:
+        """Есть ли у кошелька хоть что-то для работы (ETH на газ или WETH для вывода)"""
+        balances = self.get(wallet.address)
+        if balances is None:
+            return True  # нет данных - не пропускаем
+
+        min_balance = Web3.to_wei(self.settings["MIN_ETH_BALANCE"], "ether")
+        return balances.eth >= min_balance or balances.tokens.get(WETH_ADDRESS.lower(), 0) > 0
+
+
+_snapshot: Optional[PortfolioSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_portfolio_snapshot() -> PortfolioSnapshot:
+    """Общий снимок балансов для SETTINGS['RPC_URL']"""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = PortfolioSnapshot(get_web3())
+        return _snapshot
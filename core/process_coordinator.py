@@ -0,0 +1,97 @@
+import multiprocessing
+import queue
+from typing import Callable
+
+from loguru import logger
+
+from core.wallet_manager import Wallet, Chain, TransactionResult
+from utils.results_tracker import ResultsTracker
+
+
+class QueueResultsTracker:
+    """ResultsTracker дочернего процесса: результаты уходят координатору"""
+
+    def __init__(self, events: multiprocessing.Queue):
+        self.events = events
+
+    def update_results(self, wallet: Wallet, chain: Chain, result: TransactionResult):
+        # Приватный ключ координатору не нужен
+        self.events.put(("result", Wallet(address=wallet.address, private_key=""), chain, result))
+
+
+def _run_shard(bot_factory: Callable, shard_index: int, processes: int, events: multiprocessing.Queue):
+    """Точка входа дочернего процесса"""
+    # Логи пересылаются координатору, он пишет их в общий лог и консоль
+    logger.remove()
+    logger.add(
+        lambda message: events.put((
+            "log", message.record["level"].name, message.record["function"], message.record["message"]
+        )),
+        format="{message}"
+    )
+
+    try:
+        bot = bot_factory(results_tracker=QueueResultsTracker(events))
+        # Номера аккаунтов не пересекаются между процессами
+        bot.wallet_counter = shard_index - processes + 1
+        bot.wallet_number_step = processes
+        # Процесс сам читает файл кошельков потоком и берет только свою часть
+        bot.run_local(bot.iter_wallets(shard=(shard_index, processes)))
+    except Exception as e:
+        logger.error(f"Critical error in process #{shard_index + 1}: {str(e)}")
+
+
+class ProcessCoordinator:
+    """
+    Режим --processes N: кошельки шардируются по адресу между процессами,
+    каждый процесс выполняет свою часть со своим GIL, а координатор в родительском
+    процессе собирает логи и результаты в общий лог и единый results.xlsx.
+    """
+
+    def __init__(self, bot_factory: Callable, processes: int, results_tracker: ResultsTracker):
+        self.bot_factory = bot_factory
+        self.processes = processes
+        self.results_tracker = results_tracker
+
+    def _handle(self, event: tuple):
+        if event[0] == "log":
+            _, level, function, message = event
+            logger.patch(lambda record: record.update(function=function)).log(level, message)
+        elif event[0] == "result":
+            _, wallet, chain, result = event
+            self.results_tracker.update_results(wallet, chain, result)
+
+    def run(self):
+        # spawn: дочерние процессы не наследуют открытые соединения и потоки родителя
+        context = multiprocessing.get_context("spawn")
+        events = context.Queue()
+
+        workers = []
+        for shard_index in range(self.processes):
+            process = context.Process(
+                target=_run_shard,
+                args=(self.bot_factory, shard_index, self.processes, events),
+                name=f"Shard-{shard_index + 1}"
+            )
+            process.start()
+            workers.append(process)
+            logger.info(f"Process #{shard_index + 1} started")
+
+        while True:
+            try:
+                self._handle(events.get(timeout=0.5))
+            except queue.Empty:
+                if not any(process.is_alive() for process in workers):
+                    break
+
+        # Остаток событий от завершившихся процессов
+        while True:
+            try:
+                self._handle(events.get(timeout=0.1))
+            except queue.Empty:
+                break
+
+        for process in workers:
+            process.join()
+            if process.exitcode != 0:
+                logger.error(f"{process.name} exited with code {process.exitcode}")
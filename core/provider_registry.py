@@ -0,0 +1,229 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from web3 import AsyncWeb3, Web3
+from web3._utils.http_session_manager import HTTPSessionManager
+
+from config.settings import SETTINGS
+from core.concurrency_limiter import get_concurrency_limiter, get_worker_count
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter со счетчиком запросов для статистики переиспользования соединений.
+    Задержки и ошибки запросов внутри слота передаются ограничителю конкурентности (limiter).
+    """
+
+    def __init__(self, *args, limiter=None, **kwargs):
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self.limiter = limiter
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, *args, **kwargs):
+        with self._count_lock:
+            self.request_count += 1
+
+        if self.limiter is None or not self.limiter.in_slot():
+            return super().send(request, *args, **kwargs)
+
+        started = time.monotonic()
+        try:
+            response = super().send(request, *args, **kwargs)
+        except requests.exceptions.Timeout:
+            self.limiter.record(time.monotonic() - started, overloaded=True)
+            raise
+        except requests.exceptions.RequestException:
+            self.limiter.record(time.monotonic() - started, error=True)
+            raise
+
+        overloaded = response.status_code == 429 or response.status_code >= 500
+        self.limiter.record(time.monotonic() - started, overloaded=overloaded)
+        return response
+
+    def get_stats(self) -> dict:
+        """Количество запросов и открытых соединений (TLS handshake) для эндпоинта"""
+        pools = self.poolmanager.pools
+        connections = sum(pools[key].num_connections for key in pools.keys() if key in pools)
+        return {
+            "requests": self.request_count,
+            "connections": connections,
+            "reused": max(self.request_count - connections, 0),
+        }
+
+
+class SharedSessionManager(HTTPSessionManager):
+    """
+    web3 по умолчанию держит отдельную сессию на каждый поток.
+    Этот менеджер отдает одну потокобезопасную сессию для всех потоков.
+    """
+
+    def __init__(self, session: requests.Session):
+        super().__init__()
+        self.session = session
+
+    def cache_and_return_session(self, endpoint_uri, session=None, request_timeout=None) -> requests.Session:
+        return self.session
+
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider на общей сессии с кэшем неизменяемых констант сети (chain_id)"""
+
+    CONSTANT_METHODS = {"eth_chainId"}
+
+    def __init__(self, endpoint_uri: str, session: requests.Session, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self._request_session_manager = SharedSessionManager(session)
+        self._constants: Dict[str, Any] = {}
+
+    def make_request(self, method, params):
+        cached = self._constants.get(method)
+        if cached is not None:
+            return {"jsonrpc": "2.0", "id": next(self.request_counter), "result": cached}
+
+        response = super().make_request(method, params)
+        if method in self.CONSTANT_METHODS and response.get("result") is not None:
+            self._constants[method] = response["result"]
+        return response
+
+
+class ProviderRegistry:
+    """Общий реестр Web3 провайдеров: один keep-alive пул соединений на каждый RPC URL"""
+
+    _instances: Dict[str, Web3] = {}
+    _adapters: Dict[str, PooledHTTPAdapter] = {}
+    _block_gas_limits: Dict[str, int] = {}
+    _async_instances: Dict[str, AsyncWeb3] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_pool_size() -> int:
+        # Размер пула привязан к количеству потоков + запас для фоновых сервисов
+        return get_worker_count() * SETTINGS["RPC_POOL"]["CONNECTIONS_PER_THREAD"]
+
+    @classmethod
+    def _create_web3(cls, rpc_url: str) -> Web3:
+        pool_size = cls.get_pool_size()
+        # Ограничитель учитывает только RPC, запросы HttpClient к API в него не попадают
+        adapter = PooledHTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True, limiter=get_concurrency_limiter()
+        )
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        provider = PooledHTTPProvider(rpc_url, session, request_kwargs={"timeout": SETTINGS["RPC_POOL"]["TIMEOUT"]})
+
+        cls._adapters[rpc_url] = adapter
+        logger.debug(f"Created pooled provider for {rpc_url} (pool size: {pool_size})")
+        return Web3(provider)
+
+    @classmethod
+    def get_web3(cls, rpc_url: Optional[str] = None) -> Web3:
+        rpc_url = rpc_url or SETTINGS["RPC_URL"]
+
+        w3 = cls._instances.get(rpc_url)
+        if w3 is not None:
+            return w3
+
+        with cls._lock:
+            if rpc_url not in cls._instances:
+                cls._instances[rpc_url] = cls._create_web3(rpc_url)
+            return cls._instances[rpc_url]
+
+    @classmethod
+    def get_async_web3(cls, rpc_url: Optional[str] = None) -> AsyncWeb3:
+        """AsyncWeb3 для asyncio движка (один экземпляр на RPC URL)"""
+        rpc_url = rpc_url or SETTINGS["RPC_URL"]
+        with cls._lock:
+            if rpc_url not in cls._async_instances:
+                provider = AsyncWeb3.AsyncHTTPProvider(
+                    rpc_url,
+                    request_kwargs={"timeout": ClientTimeout(total=SETTINGS["RPC_POOL"]["TIMEOUT"])}
+                )
+                cls._async_instances[rpc_url] = AsyncWeb3(provider)
+            return cls._async_instances[rpc_url]
+
+    @classmethod
+    async def open_async_session(cls, rpc_url: Optional[str] = None):
+        """
+        Keep-alive сессия aiohttp для AsyncWeb3 (по умолчанию web3 закрывает соединение после
+        каждого запроса). Вызывается внутри event loop движка.
+        """
+        w3 = cls.get_async_web3(rpc_url)
+        session = ClientSession(
+            raise_for_status=True,
+            connector=TCPConnector(limit=SETTINGS["ASYNC_ENGINE"]["RPC_CONNECTIONS"])
+        )
+        await w3.provider.cache_async_session(session)
+
+    @classmethod
+    def verify_chain(cls, rpc_url: Optional[str] = None, expected_chain_id: Optional[int] = None) -> int:
+        """
+        Однократная загрузка констант сети при старте и сверка chain_id с конфигом.
+        Дальше chain_id отдается провайдером из кэша без обращения к RPC.
+        """
+        rpc_url = rpc_url or SETTINGS["RPC_URL"]
+        expected_chain_id = expected_chain_id or SETTINGS["CHAIN_ID"]
+        w3 = cls.get_web3(rpc_url)
+
+        chain_id = w3.eth.chain_id
+        if chain_id != expected_chain_id:
+            raise ValueError(f"RPC {rpc_url} returned chain_id {chain_id}, expected {expected_chain_id}")
+
+        cls._block_gas_limits[rpc_url] = w3.eth.get_block("latest")["gasLimit"]
+        logger.info(f"Connected to chain {chain_id}, block gas limit: {cls._block_gas_limits[rpc_url]}")
+        return chain_id
+
+    @classmethod
+    def get_block_gas_limit(cls, rpc_url: Optional[str] = None) -> int:
+        rpc_url = rpc_url or SETTINGS["RPC_URL"]
+        if rpc_url not in cls._block_gas_limits:
+            cls._block_gas_limits[rpc_url] = cls.get_web3(rpc_url).eth.get_block("latest")["gasLimit"]
+        return cls._block_gas_limits[rpc_url]
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, dict]:
+        """Статистика переиспользования соединений по каждому эндпоинту"""
+        with cls._lock:
+            return {url: adapter.get_stats() for url, adapter in cls._adapters.items()}
+
+    @classmethod
+    def log_stats(cls):
+        for url, stats in cls.get_stats().items():
+            logger.info(
+                f"RPC pool {url}: {stats['requests']} requests, "
+                f"{stats['connections']} connections opened, {stats['reused']} reused"
+            )
+
+
+def get_web3(rpc_url: Optional[str] = None) -> Web3:
+    """Получение общего Web3 для RPC URL (по умолчанию SETTINGS['RPC_URL'])"""
+    return ProviderRegistry.get_web3(rpc_url)
+
+
+def get_async_web3(rpc_url: Optional[str] = None) -> AsyncWeb3:
+    """Получение общего AsyncWeb3 для RPC URL (по умолчанию SETTINGS['RPC_URL'])"""
+    return ProviderRegistry.get_async_web3(rpc_url)
+
+
+def make_batch_request(w3: Web3, calls: List[Tuple[str, Any]]) -> list:
+    """
+    JSON-RPC batch напрямую через провайдер, результаты в порядке запросов (None при ошибке).
+    w3.batch_requests() не используем: он переключает общий провайдер в режим батча
+    и перехватывает запросы остальных потоков.
+    """
+    if not calls:
+        return []
+
+    responses = w3.provider.make_batch_request(calls)
+    if not isinstance(responses, list):
+        raise ValueError(f"Batch request failed: {responses.get('error')}")
+
+    return [response.get("result") for response in responses]
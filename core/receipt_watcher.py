@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+
+from hexbytes import HexBytes
+from loguru import logger
+from web3 import Web3
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+
+from config.settings import SETTINGS
+from core.provider_registry import get_web3, make_batch_request
+
+
+class PendingTransaction:
+    def __init__(self, tx_hash: bytes, timeout: float):
+        self.tx_hash = tx_hash
+        self.future = Future()
+        self.created_at = time.time()
+        self.deadline = self.created_at + timeout
+
+
+class ReceiptWatcher:
+    """
+    Фоновый сервис ожидания receipt: один поток опрашивает новые блоки,
+    сверяет их транзакции со всеми ожидающими хешами и резолвит futures.
+    Нагрузка на RPC зависит от количества блоков, а не от числа транзакций.
+    """
+
+    RECENT_BLOCKS = 32
+    MAX_CATCH_UP_BLOCKS = 50
+
+    def __init__(self, w3: Web3):
+        self.w3 = w3
+        self.settings = SETTINGS["RECEIPT_WATCHER"]
+        self._pending: Dict[bytes, PendingTransaction] = {}
+        # Хеши транзакций из последних блоков: tx, замайненная до вызова watch(), не теряется
+        self._recent = deque(maxlen=self.RECENT_BLOCKS)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._last_block: Optional[int] = None
+        self._last_sweep = time.time()
+
+    def watch(self, tx_hash, timeout: float = None) -> Future:
+        """Регистрация хеша транзакции, возвращает Future с receipt"""
+        tx_hash = bytes(HexBytes(tx_hash))
+        pending = PendingTransaction(tx_hash, timeout or self.settings["TIMEOUT"])
+
+        with self._lock:
+            existing = self._pending.get(tx_hash)
+            if existing is not None:
+                return existing.future
+
+            self._pending[tx_hash] = pending
+            already_mined = any(tx_hash in block_hashes for block_hashes in self._recent)
+
+        if already_mined:
+            self._resolve([tx_hash])
+
+        self._ensure_started()
+        return pending.future
+
+    def wait(self, tx_hash, timeout: float = None):
+        """Блокирующее ожидание receipt (замена wait_for_transaction_receipt)"""
+        timeout = timeout or self.settings["TIMEOUT"]
+        future = self.watch(tx_hash, timeout)
+        try:
+            # Свой таймаут: ожидающий не зависит от того, жив ли поток опроса
+            return future.result(timeout=timeout + self.settings["POLL_INTERVAL"])
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(bytes(HexBytes(tx_hash)), None)
+            raise TimeExhausted(
+                f"Transaction {HexBytes(tx_hash).to_0x_hex()} is not in the chain after {timeout} seconds"
+            )
+
+    def _ensure_started(self):
+        with self._lock:
+            # Поток, которому уже отправлен stop, может еще висеть в запросе к RPC -
+            # он завершится сам, а опрос продолжает новый поток со своим событием остановки
+            if self._thread is None or not self._thread.is_alive() or self._stop_event.is_set():
+                self._stop_event = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._stop_event,), name="ReceiptWatcher", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, stop_event = self._thread, self._stop_event
+        stop_event.set()
+        if thread is not None:
+            thread.join(timeout=self.settings["POLL_INTERVAL"] * 2)
+
+    def _run(self, stop_event: threading.Event):
+        while not stop_event.is_set():
+            try:
+                self._poll()
+            except Exception as e:
+                logger.warning(f"Receipt watcher poll error: {str(e)}")
+            stop_event.wait(self.settings["POLL_INTERVAL"])
+
+    def _poll(self):
+        current_block = self.w3.eth.block_number
+
+        if self._last_block is None or current_block - self._last_block > self.MAX_CATCH_UP_BLOCKS:
+            # Старые блоки покрываются sweep-проверкой receipt
+            self._last_block = current_block - 1
+
+        for block_number in range(self._last_block + 1, current_block + 1):
+            block = self.w3.eth.get_block(block_number)
+            block_hashes = {bytes(tx) for tx in block["transactions"]}
+
+            with self._lock:
+                self._recent.append(block_hashes)
+                matched = [tx_hash for tx_hash in self._pending if tx_hash in block_hashes]
+
+            if matched:
+                self._resolve(matched)
+            self._last_block = block_number
+
+        self._sweep()
+
+    def _sweep(self):
+        """Досрочная проверка receipt для долго висящих транзакций и обработка таймаутов"""
+        now = time.time()
+        if now - self._last_sweep < self.settings["SWEEP_INTERVAL"]:
+            return
+        self._last_sweep = now
+
+        with self._lock:
+            stale = [p for p in self._pending.values() if now - p.created_at >= self.settings["SWEEP_INTERVAL"]]
+
+        if stale:
+            self._resolve([p.tx_hash for p in stale], missing_ok=True)
+
+        with self._lock:
+            expired = [p for p in self._pending.values() if now >= p.deadline]
+            for pending in expired:
+                del self._pending[pending.tx_hash]
+
+        for pending in expired:
+            pending.future.set_exception(TimeExhausted(
+                f"Transaction {HexBytes(pending.tx_hash).to_0x_hex()} is not in the chain "
+                f"after {self.settings['TIMEOUT']} seconds"
+            ))
+
+    def _resolve(self, tx_hashes: list, missing_ok: bool = False):
+        """Пакетное получение receipt и резолв соответствующих futures"""
+        try:
+            results = make_batch_request(
+                self.w3,
+                [("eth_getTransactionReceipt", [HexBytes(tx_hash).to_0x_hex()]) for tx_hash in tx_hashes]
+            )
+        except Exception as e:
+            logger.warning(f"Receipt batch request failed: {str(e)}")
+            return
+
+        receipts = {}
+        for tx_hash, result in zip(tx_hashes, results):
+            if result is not None:
+                receipts[tx_hash] = AttributeDict.recursive(receipt_formatter(result))
+            elif not missing_ok:
+                logger.debug(f"Receipt for {HexBytes(tx_hash).to_0x_hex()} is not available yet")
+
+        with self._lock:
+            resolved = [(self._pending.pop(tx_hash), receipt)
+                        for tx_hash, receipt in receipts.items()
+                        if tx_hash in self._pending]
+
+        for pending, receipt in resolved:
+            pending.future.set_result(receipt)
+
+
+_watchers: Dict[str, ReceiptWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_receipt_watcher(rpc_url: Optional[str] = None) -> ReceiptWatcher:
+    """Общий ReceiptWatcher для RPC URL (по умолчанию SETTINGS['RPC_URL'])"""
+    rpc_url = rpc_url or SETTINGS["RPC_URL"]
+    with _watchers_lock:
+        if rpc_url not in _watchers:
+            _watchers[rpc_url] = ReceiptWatcher(get_web3(rpc_url))
+        return _watchers[rpc_url]
+
+
+def stop_receipt_watchers():
+    with _watchers_lock:
+        for watcher in _watchers.values():
+            watcher.stop()
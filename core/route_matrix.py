@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from config.settings import SETTINGS
+from core.base_module import BaseModule
+from core.wallet_manager import Chain
+
+
+class RouteMatrix:
+    """
+    Матрица доступных маршрутов (модуль, сеть назначения) -> Chain на весь запуск.
+    Строится один раз при старте и обновляется фоновым потоком раз в REFRESH_INTERVAL.
+    """
+
+    def __init__(self, modules: List[BaseModule], proxy: dict = None):
+        self.modules = modules
+        self.proxy = proxy
+        self.settings = SETTINGS["ROUTE_MATRIX"]
+        self._routes: Dict[str, Dict[int, Chain]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _discover(self, module: BaseModule) -> Optional[Dict[int, Chain]]:
+        try:
+            chains = module.get_available_chains(0, self.proxy)
+            if asyncio.iscoroutine(chains):
+                # Асинхронный модуль: опрос в своем event loop потока пула
+                chains = asyncio.run(chains)
+        except Exception as e:
+            logger.warning(f"Failed to get available chains for {module.module_name}: {str(e)}")
+            return None
+        return {chain.id: chain for chain in chains}
+
+    def refresh(self):
+        """Параллельный опрос всех модулей; при ошибке сохраняются прошлые маршруты модуля"""
+        with ThreadPoolExecutor(max_workers=len(self.modules) or 1) as executor:
+            discovered = list(executor.map(self._discover, self.modules))
+
+        with self._lock:
+            for module, routes in zip(self.modules, discovered):
+                if routes or module.module_name not in self._routes:
+                    self._routes[module.module_name] = routes or {}
+
+        logger.info("Route matrix updated: " + ", ".join(
+            f"{module.module_name}={len(self._routes.get(module.module_name, {}))}" for module in self.modules
+        ))
+
+    def get_chains(self, module: BaseModule) -> List[Chain]:
+        with self._lock:
+            return list(self._routes.get(module.module_name, {}).values())
+
+    def get_chain(self, module: BaseModule, chain_id: int) -> Optional[Chain]:
+        with self._lock:
+            return self._routes.get(module.module_name, {}).get(chain_id)
+
+    def start(self):
+        self.refresh()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="RouteMatrix", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.settings["REFRESH_INTERVAL"]):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Route matrix refresh error: {str(e)}")
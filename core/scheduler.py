@@ -0,0 +1,128 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Generator, Iterable, List, Tuple, Union
+
+from loguru import logger
+
+# Шаг кошелька - генератор: между yield выполняется работа, yield возвращает паузу в секундах
+# или Future (например, из TxPipeline) - кошелек продолжится после его завершения
+WalletSteps = Generator[Union[float, Future], None, None]
+
+
+class StepScheduler:
+    """
+    Планировщик шагов кошельков: задержки между кошельками, модулями и транзакциями
+    не занимают потоки. Каждый кошелек - генератор шагов, после шага он попадает
+    в очередь с приоритетом по времени "не раньше", и воркеры берут только
+    наступившие шаги. Одновременно в работе не больше max_active кошельков;
+    новые кошельки берет из итератора отдельный поток, поэтому медленная загрузка
+    (чтение файла, снимок балансов) не блокирует воркеров.
+    """
+
+    def __init__(self, workers: int, max_active: int):
+        self.workers = workers
+        self.max_active = max_active
+        self._queue: List[Tuple[float, int, WalletSteps]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._slot_free = threading.Condition(self._lock)
+        self._feeding = False
+        self._active = 0
+        self._running = 0
+
+    def _push(self, due: float, steps: WalletSteps):
+        heapq.heappush(self._queue, (due, next(self._counter), steps))
+        self._condition.notify()
+
+    def _feed(self, wallet_steps: Iterable[WalletSteps]):
+        """Новые кошельки берутся из итератора по мере освобождения мест"""
+        iterator = iter(wallet_steps)
+        try:
+            while True:
+                with self._lock:
+                    while self._active >= self.max_active:
+                        self._slot_free.wait()
+                # Итератор может читать файл или ждать RPC - вне блокировки
+                steps = next(iterator, None)
+                if steps is None:
+                    return
+                with self._lock:
+                    self._active += 1
+                    self._push(time.monotonic(), steps)
+        except Exception as e:
+            logger.error(f"Failed to load next wallet: {str(e)}")
+        finally:
+            with self._lock:
+                self._feeding = False
+                self._condition.notify_all()
+
+    def _finished(self) -> bool:
+        return not self._feeding and not self._queue and self._running == 0 and self._active == 0
+
+    def _next_due(self):
+        """Ожидание ближайшего наступившего шага, None - все кошельки завершены"""
+        with self._condition:
+            while True:
+                if self._finished():
+                    self._condition.notify_all()
+                    return None
+
+                if self._queue:
+                    due = self._queue[0][0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        self._running += 1
+                        return heapq.heappop(self._queue)[2]
+                    self._condition.wait(wait)
+                else:
+                    self._condition.wait()
+
+    def _resume(self, steps: WalletSteps):
+        with self._condition:
+            self._push(time.monotonic(), steps)
+
+    def _step_done(self, steps: WalletSteps, delay):
+        with self._condition:
+            self._running -= 1
+            if delay is None:
+                self._active -= 1
+                self._slot_free.notify()
+                self._condition.notify_all()
+            elif not isinstance(delay, Future):
+                self._push(time.monotonic() + delay, steps)
+
+        if isinstance(delay, Future):
+            delay.add_done_callback(lambda _: self._resume(steps))
+
+    def _worker(self):
+        while True:
+            steps = self._next_due()
+            if steps is None:
+                return
+
+            try:
+                delay = next(steps)
+            except StopIteration:
+                delay = None
+            except Exception as e:
+                logger.error(f"Wallet step failed: {str(e)}")
+                delay = None
+
+            self._step_done(steps, delay)
+
+    def run(self, wallet_steps: Iterable[WalletSteps]):
+        """Выполнение всех кошельков, возврат после завершения последнего"""
+        self._feeding = True
+        threads = [threading.Thread(target=self._feed, args=(wallet_steps,), name="StepFeeder", daemon=True)]
+        threads += [
+            threading.Thread(target=self._worker, name=f"StepWorker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
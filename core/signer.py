@@ -0,0 +1,89 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from eth_account import Account
+from eth_account.datastructures import SignedTransaction
+from eth_account.signers.local import LocalAccount
+
+from config.settings import SETTINGS
+from core.wallet_manager import Wallet
+
+# Аккаунты в процессе пула подписи: ключ разбирается один раз на процесс
+_worker_accounts: Dict[str, LocalAccount] = {}
+
+
+def _sign_in_worker(items: Sequence[Tuple[str, dict]]) -> List[SignedTransaction]:
+    """Подпись пачки транзакций в процессе пула"""
+    signed = []
+    for private_key, tx in items:
+        account = _worker_accounts.get(private_key)
+        if account is None:
+            account = _worker_accounts[private_key] = Account.from_key(private_key)
+        signed.append(account.sign_transaction(tx))
+    return signed
+
+
+class Signer:
+    """
+    Подпись транзакций аккаунтом LocalAccount, созданным один раз при загрузке кошелька,
+    вместо разбора hex ключа на каждую подпись. При PROCESSES > 0 пачки подписываются
+    в пуле процессов - для запусков, упирающихся в подпись (secp256k1 держит GIL).
+    """
+
+    def __init__(self):
+        self.settings = SETTINGS["SIGNER"]
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_account(wallet: Wallet) -> LocalAccount:
+        if wallet.account is None:
+            wallet.account = Account.from_key(wallet.private_key)
+        return wallet.account
+
+    def sign(self, wallet: Wallet, tx: dict) -> SignedTransaction:
+        return self.get_account(wallet).sign_transaction(tx)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: процессы пула не наследуют соединения и потоки родителя
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.settings["PROCESSES"],
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def sign_batch(self, items: Sequence[Tuple[Wallet, dict]]) -> List[SignedTransaction]:
+        """Подпись нескольких транзакций за вызов, порядок результатов совпадает с items"""
+        if not items:
+            return []
+        if self.settings["PROCESSES"] <= 0 or len(items) < self.settings["MIN_POOL_BATCH"]:
+            return [self.sign(wallet, tx) for wallet, tx in items]
+
+        # Пачка делится на части по числу процессов, в процесс уходит одна задача на часть
+        payload = [(wallet.private_key, tx) for wallet, tx in items]
+        chunk_size = -(-len(payload) // self.settings["PROCESSES"])
+        chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+        pool = self._get_pool()
+        return [signed for part in pool.map(_sign_in_worker, chunks) for signed in part]
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_signer: Optional[Signer] = None
+_signer_lock = threading.Lock()
+
+
+def get_signer() -> Signer:
+    global _signer
+    with _signer_lock:
+        if _signer is None:
+            _signer = Signer()
+        return _signer
@@ -0,0 +1,51 @@
+import threading
+from typing import Optional, Sequence
+
+from web3 import Web3
+from web3.contract import Contract
+
+from config.settings import SETTINGS
+from core.fee_oracle import get_fee_oracle
+from core.provider_registry import get_web3
+
+
+class TxBuilder:
+    """
+    Сборка транзакций без скрытых RPC запросов: calldata кодируется локально по ABI,
+    комиссия берется из FeeOracle, chain id - из сверенного при старте конфига.
+    В отличие от build_transaction web3, газ не оценивается неявно - модуль делает
+    не больше одной явной оценки.
+    """
+
+    def __init__(self, w3: Web3):
+        self.w3 = w3
+        self.fee_oracle = get_fee_oracle()
+
+    def build(self, from_address: str, contract: Contract, function_name: str, args: Sequence = (),
+              value: int = 0, gas: Optional[int] = None) -> dict:
+        tx = {
+            "from": from_address,
+            "to": contract.address,
+            "value": value,
+            "data": contract.encode_abi(function_name, args=list(args)),
+            **self.fee_oracle.get_fee_fields(),
+            "chainId": SETTINGS["CHAIN_ID"]
+        }
+        if gas is not None:
+            tx["gas"] = gas
+        return tx
+
+    def estimate_gas(self, tx: dict, multiplier: float = 1.0) -> int:
+        return int(self.w3.eth.estimate_gas(tx) * multiplier)
+
+
+_builder: Optional[TxBuilder] = None
+_builder_lock = threading.Lock()
+
+
+def get_tx_builder() -> TxBuilder:
+    global _builder
+    with _builder_lock:
+        if _builder is None:
+            _builder = TxBuilder(get_web3())
+        return _builder
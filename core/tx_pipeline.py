@@ -0,0 +1,248 @@
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from loguru import logger
+
+from config.settings import SETTINGS
+from core.base_module import BaseModule
+from core.job_journal import get_job_journal
+from core.provider_registry import get_web3
+from core.receipt_watcher import get_receipt_watcher
+from core.signer import get_signer
+from core.wallet_manager import Wallet, Chain, TransactionResult
+from utils.logger import log_transaction_success, log_transaction_error
+
+
+@dataclass
+class PipelineJob:
+    """Один вызов модуля для кошелька: одна или несколько транзакций"""
+    module: BaseModule
+    wallet: Wallet
+    wallet_number: int
+    destination_chain: Chain
+    amount: dict
+    run_id: Optional[int] = None
+    future: Future = field(default_factory=Future)
+    remaining: int = 0
+    tx_hash: str = ""
+    error_message: str = ""
+
+
+@dataclass
+class PipelineItem:
+    job: PipelineJob
+    tx: dict
+    signed: Any = None
+    tx_hash: Any = None
+    receipt: Any = None
+    error: Optional[Exception] = None
+
+
+class TxPipeline:
+    """
+    Конвейер отправки транзакций с ограниченными очередями между стадиями:
+    сборка и оценка газа -> подпись -> отправка -> подтверждение (общий ReceiptWatcher)
+    -> запись в ResultsTracker. Модуль поставляет только build_transactions, поэтому
+    поток не ждет блок на каждую транзакцию, и скорость отправки ограничена RPC.
+    Подпись и отправка разбиты на очереди по кошельку: транзакции одного адреса
+    обрабатывает один поток, и nonce уходят в сеть по порядку.
+    """
+
+    def __init__(self, results_tracker):
+        self.settings = SETTINGS["PIPELINE"]
+        self.results_tracker = results_tracker
+        self.journal = get_job_journal()
+        self.w3 = get_web3()
+        self.signer = get_signer()
+
+        queue_size = self.settings["QUEUE_SIZE"]
+        self._build_queue: "queue.Queue[PipelineJob]" = queue.Queue(queue_size)
+        self._sign_queues: "List[queue.Queue[PipelineItem]]" = [
+            queue.Queue(queue_size) for _ in range(self.settings["SIGN_WORKERS"])
+        ]
+        self._broadcast_queues: "List[queue.Queue[PipelineItem]]" = [
+            queue.Queue(queue_size) for _ in range(self.settings["BROADCAST_WORKERS"])
+        ]
+        # Без ограничения: в нее пишет поток ReceiptWatcher, и блокироваться он не должен
+        self._record_queue: "queue.Queue[PipelineItem]" = queue.Queue()
+
+        self._jobs_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, module: BaseModule, wallet: Wallet, destination_chain: Chain, amount: dict,
+               wallet_number: int, run_id: Optional[int] = None) -> Future:
+        """Постановка вызова модуля в конвейер, Future завершается TransactionResult"""
+        job = PipelineJob(module, wallet, wallet_number, destination_chain, amount, run_id)
+        self._build_queue.put(job)
+        return job.future
+
+    def start(self):
+        stages = [
+            ("Build", self._build, [self._build_queue] * self.settings["BUILD_WORKERS"]),
+            ("Sign", self._sign, self._sign_queues),
+            ("Broadcast", self._broadcast, self._broadcast_queues),
+            ("Record", self._record, [self._record_queue]),
+        ]
+        self._stop_event.clear()
+        for name, handler, sources in stages:
+            for i, source in enumerate(sources):
+                thread = threading.Thread(
+                    target=self._run_stage, args=(handler, source), name=f"Pipeline{name}-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def _run_stage(self, handler, source: queue.Queue):
+        while not self._stop_event.is_set():
+            try:
+                entry = source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                handler(entry)
+            except Exception as e:
+                logger.error(f"Pipeline stage error: {str(e)}")
+
+    @staticmethod
+    def _queue_for(queues: List[queue.Queue], wallet: Wallet) -> queue.Queue:
+        """Очередь стадии для кошелька: один адрес всегда попадает в один поток"""
+        return queues[hash(wallet.address) % len(queues)]
+
+    def _fail(self, item: PipelineItem, error: Exception):
+        item.error = error
+        self._record_queue.put(item)
+
+    def _build(self, job: PipelineJob):
+        try:
+            transactions = job.module.build_transactions(
+                job.wallet, job.destination_chain, job.amount, job.wallet_number
+            )
+        except Exception as e:
+            job.remaining = 1
+            self._fail(PipelineItem(job, {}), e)
+            return
+
+        if not transactions:
+            self._finish(job, TransactionResult(
+                success=False, error_message="Nothing to send", module_name=job.module.module_name
+            ))
+            return
+
+        job.remaining = len(transactions)
+        if self.journal and job.run_id is not None:
+            self.journal.expect_txs(len(transactions), job.run_id)
+        for tx in transactions:
+            item = PipelineItem(job, tx)
+            if job.error_message:
+                # Предыдущая транзакция вызова уже не прошла - остальные не отправляем
+                self._fail(item, Exception("Skipped after previous failure"))
+                continue
+            try:
+                # Оценка газа уже симулирует транзакцию, preflight - только для газа извне.
+                # Nonce берется после проверки, чтобы отклоненная транзакция его не занимала
+                if "gas" not in tx:
+                    tx["gas"] = job.module.estimate_gas(tx)
+                else:
+                    job.module.preflight(tx)
+                job.module.prepare_transaction(job.wallet, tx)
+            except Exception as e:
+                job.module.handle_failed_transaction(job.wallet, tx, e)
+                with self._jobs_lock:
+                    job.error_message = job.error_message or str(e)
+                self._fail(item, e)
+                continue
+            self._queue_for(self._sign_queues, job.wallet).put(item)
+
+    def _sign(self, item: PipelineItem):
+        # Стадия забирает все готовые транзакции своей очереди и подписывает их одной пачкой
+        source = self._queue_for(self._sign_queues, item.job.wallet)
+        items = [item]
+        while len(items) < self.signer.settings["BATCH_SIZE"]:
+            try:
+                items.append(source.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            signed = self.signer.sign_batch([(entry.job.wallet, entry.tx) for entry in items])
+        except Exception:
+            # Ошибка в пачке - подписываем по одной, чтобы не потерять остальные
+            signed = None
+
+        for index, entry in enumerate(items):
+            try:
+                entry.signed = signed[index] if signed is not None else self.signer.sign(entry.job.wallet, entry.tx)
+            except Exception as e:
+                entry.job.module.handle_failed_transaction(entry.job.wallet, entry.tx, e)
+                self._fail(entry, e)
+                continue
+            self._queue_for(self._broadcast_queues, entry.job.wallet).put(entry)
+
+    def _broadcast(self, item: PipelineItem):
+        try:
+            item.tx_hash = self.w3.eth.send_raw_transaction(item.signed.raw_transaction)
+        except Exception as e:
+            item.job.module.handle_failed_transaction(item.job.wallet, item.tx, e)
+            self._fail(item, e)
+            return
+
+        if self.journal:
+            self.journal.record_tx(item.tx_hash, item.job.run_id)
+
+        # Подтверждение - общий ReceiptWatcher, стадия не занимает потоки
+        get_receipt_watcher().watch(item.tx_hash).add_done_callback(
+            lambda future: self._on_receipt(item, future)
+        )
+
+    def _on_receipt(self, item: PipelineItem, future: Future):
+        try:
+            item.receipt = future.result()
+        except Exception as e:
+            item.error = e
+        # Вызывается в потоке ReceiptWatcher: только передача, без ожидания
+        self._record_queue.put_nowait(item)
+
+    def _record(self, item: PipelineItem):
+        job = item.job
+        if item.error is None and item.receipt["status"] != 1:
+            item.error = Exception("Transaction failed")
+
+        if item.receipt is not None and self.journal:
+            self.journal.set_tx_status(item.tx_hash, item.receipt)
+
+        if item.error is None:
+            job.tx_hash = item.tx_hash.hex()
+            log_transaction_success(job.wallet_number, job.tx_hash, f"{job.module.module_name} transaction")
+
+        with self._jobs_lock:
+            if item.error is not None and not job.error_message:
+                job.error_message = str(item.error)
+            job.remaining -= 1
+            if job.remaining > 0:
+                return
+
+        if job.error_message:
+            log_transaction_error(job.wallet_number, job.error_message, f"{job.module.module_name} transaction")
+            result = TransactionResult(success=False, error_message=job.error_message,
+                                       module_name=job.module.module_name)
+        else:
+            result = TransactionResult(success=True, tx_hash=job.tx_hash, module_name=job.module.module_name)
+        self._finish(job, result)
+
+    def _finish(self, job: PipelineJob, result: TransactionResult):
+        try:
+            if self.journal and job.run_id is not None:
+                self.journal.finish_run(job.run_id, result)
+            self.results_tracker.update_results(job.wallet, job.destination_chain, result)
+        finally:
+            job.future.set_result(result)
@@ -1,8 +1,16 @@
-from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 import pandas as pd
+from openpyxl import load_workbook
 from loguru import logger
 from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from config.settings import SETTINGS
+from utils.address import to_checksum
+
+WALLET_COLUMNS = ['Wallet Address', 'Private Key', 'Proxy', 'Contracts count', 'Bridge Chain Id']
 
 
 @dataclass
@@ -33,6 +41,8 @@ class Wallet:
     proxy: Optional[ProxyConfig] = None
     contracts_count: int = 1
     bridge_chain_id: Optional[int] = None
+    # Аккаунт для подписи, создается из ключа один раз при загрузке
+    account: Optional[LocalAccount] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -70,48 +80,115 @@ class WalletManager:
             return None
 
     @staticmethod
-    def load_wallets(excel_path: str) -> list[Wallet]:
-        try:
-            # Читаем Excel файл
-            df = pd.read_excel(excel_path)
-            wallets = []
-
-            for index, row in df.iterrows():
-                try:
-                    # Проверяем обязательные данные
-                    if pd.isna(row['Private Key']) or pd.isna(row['Wallet Address']):
-                        continue
+    def _read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Чтение файла кошельков частями: CSV, Parquet (нужен pyarrow) или Excel"""
+        suffix = Path(path).suffix.lower()
+        if suffix == ".csv":
+            yield from pd.read_csv(path, chunksize=chunk_size, dtype=str)
+        elif suffix == ".parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Parquet wallets file requires pyarrow: pip install pyarrow") from e
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
+        else:
+            # read_only режим openpyxl читает лист построчно, без загрузки всей книги
+            workbook = load_workbook(path, read_only=True, data_only=True)
+            try:
+                rows = workbook.active.iter_rows(values_only=True)
+                columns = [str(column).strip() if column is not None else "" for column in next(rows, ())]
+                while True:
+                    chunk = list(islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    yield pd.DataFrame(chunk, columns=columns)
+            finally:
+                workbook.close()
 
-                    # Парсим прокси
-                    proxy_config = WalletManager._parse_proxy(row['Proxy']) if pd.notna(row['Proxy']) else None
+    @staticmethod
+    def _validate_chunk(df: pd.DataFrame) -> pd.DataFrame:
+        """Проверка и приведение колонок сразу для всей части файла"""
+        for column in WALLET_COLUMNS:
+            if column not in df.columns:
+                df[column] = None
+
+        df = df[WALLET_COLUMNS].copy()
+        df["Wallet Address"] = df["Wallet Address"].astype("string").str.strip()
+        df["Private Key"] = df["Private Key"].astype("string").str.strip()
+        # Строки без ключа или адреса пропускаются
+        valid = (df["Wallet Address"].fillna("") != "") & (df["Private Key"].fillna("") != "")
+        df = df[valid].copy()
+
+        df["Contracts count"] = pd.to_numeric(df["Contracts count"], errors="coerce").fillna(1).astype(int)
+        df["Bridge Chain Id"] = pd.to_numeric(df["Bridge Chain Id"], errors="coerce").astype("Int64")
+        return df
 
-                    # Получаем количество контрактов
-                    contracts_count = int(row['Contracts count']) if pd.notna(row['Contracts count']) else 1
+    @staticmethod
+    def _shard_index(address: str, processes: int) -> int:
+        try:
+            return int(address, 16) % processes
+        except ValueError:
+            # Некорректный адрес - ошибка строки будет выведена одним процессом
+            return 0
 
-                    # Получаем chain_id для бриджа
-                    bridge_chain_id = int(row['Bridge Chain Id']) if pd.notna(row['Bridge Chain Id']) else None
+    @staticmethod
+    def iter_wallets(path: str, chunk_size: int = None, shard: Tuple[int, int] = None) -> Iterator[Wallet]:
+        """
+        Потоковая загрузка кошельков: файл читается частями, Wallet отдаются генератором,
+        поэтому память не зависит от числа кошельков в файле.
+        shard=(index, processes) - только кошельки процесса index: разбиение по адресу, кошелек
+        (а значит и его nonce) всегда принадлежит одному процессу. Фильтр применяется
+        до вывода аккаунта из ключа, чужие строки не разбираются.
+        """
+        chunk_size = chunk_size or SETTINGS["WALLET_LOADER"]["CHUNK_SIZE"]
+        offset = 0
+        for df in WalletManager._read_chunks(path, chunk_size):
+            rows_count = len(df)
+            df = WalletManager._validate_chunk(df.reset_index(drop=True))
+            if shard is not None:
+                shard_index, processes = shard
+                df = df[df["Wallet Address"].map(lambda address: WalletManager._shard_index(address, processes)) == shard_index]
+
+            for index, address, private_key, proxy, contracts_count, bridge_chain_id in zip(
+                    df.index, df["Wallet Address"], df["Private Key"], df["Proxy"],
+                    df["Contracts count"], df["Bridge Chain Id"]):
+                try:
+                    # Адрес нормализуется один раз при загрузке и должен совпадать с ключом
+                    address = to_checksum(address)
+                    account = Account.from_key(private_key)
+                    if account.address != address:
+                        raise ValueError(f"address {address} does not match private key ({account.address})")
 
                     # Создаем объект Wallet
                     wallet = Wallet(
-                        address=str(row['Wallet Address']),
-                        private_key=str(row['Private Key']),
-                        proxy=proxy_config,
-                        contracts_count=contracts_count,
-                        bridge_chain_id=bridge_chain_id
+                        address=address,
+                        private_key=private_key,
+                        proxy=WalletManager._parse_proxy(proxy) if pd.notna(proxy) else None,
+                        contracts_count=int(contracts_count),
+                        bridge_chain_id=int(bridge_chain_id) if pd.notna(bridge_chain_id) else None,
+                        account=account
                     )
-                    wallets.append(wallet)
                     logger.debug(
-                        f"Loaded wallet {wallet.address} with contracts_count: {wallet.contracts_count}, bridge_chain_id: {bridge_chain_id}")
+                        f"Loaded wallet {wallet.address} with contracts_count: {wallet.contracts_count}, bridge_chain_id: {wallet.bridge_chain_id}")
                 except Exception as e:
-                    logger.error(f"Error processing row {index + 1}: {str(e)}")
+                    logger.error(f"Error processing row {offset + index + 1}: {str(e)}")
                     continue
+                yield wallet
+
+            offset += rows_count
+
+    @staticmethod
+    def load_wallets(path: str) -> list[Wallet]:
+        try:
+            wallets = list(WalletManager.iter_wallets(path))
 
             if not wallets:
-                logger.error("No valid wallets found in Excel file")
+                logger.error("No valid wallets found in wallets file")
             else:
                 logger.info(f"Successfully loaded {len(wallets)} wallets")
 
             return wallets
         except Exception as e:
-            logger.error(f"Error loading wallets from Excel: {str(e)}")
-            return []
\ No newline at end of file
+            logger.error(f"Error loading wallets from {path}: {str(e)}")
+            return []
@@ -0,0 +1,97 @@
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import SETTINGS
+from core.base_module import BaseModule
+from core.portfolio_snapshot import get_portfolio_snapshot
+from core.route_matrix import RouteMatrix
+from core.wallet_manager import Wallet, Chain
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    module: BaseModule
+    destination_chain: Chain
+    amount_spec: dict
+
+    def to_dict(self) -> dict:
+        return {
+            "module": self.module.module_name,
+            "chain_id": self.destination_chain.id,
+            "chain_name": self.destination_chain.name,
+            "amount": self.amount_spec,
+        }
+
+
+@dataclass(frozen=True)
+class WalletPlan:
+    address: str
+    steps: Tuple[PlanStep, ...]
+
+    def to_dict(self) -> dict:
+        return {"wallet": self.address, "steps": [step.to_dict() for step in self.steps]}
+
+
+class PlanCompiler:
+    """
+    Компиляция плана кошелька один раз перед выполнением: порядок модулей,
+    сети назначения из матрицы маршрутов и фильтр bridge_chain_id. Исполнитель
+    только проходит по готовому неизменяемому списку шагов.
+    """
+
+    def __init__(self, modules: List[BaseModule], route_matrix: RouteMatrix):
+        self.modules = tuple(modules)
+        self.route_matrix = route_matrix
+        self.snapshot = get_portfolio_snapshot()
+
+    def select_destination_chain(self, module: BaseModule, wallet: Wallet, wallet_number: int) -> Optional[Chain]:
+        """Сеть назначения для модуля или None, если модуль нужно пропустить"""
+        # Выбор сети на основе bridge_chain_id только для бриджей
+        if module.is_bridge and wallet.bridge_chain_id is not None:
+            destination_chain = self.route_matrix.get_chain(module, wallet.bridge_chain_id)
+            # Если указанная сеть недоступна для бриджа, пропускаем этот модуль
+            if destination_chain is None:
+                logger.warning(
+                    f"[Account #{wallet_number}] Specified chain {wallet.bridge_chain_id} not available for {module.module_name}, skipping")
+            return destination_chain
+
+        available_chains = self.route_matrix.get_chains(module)
+        if not available_chains:
+            logger.error(f"[Account #{wallet_number}] No available chains for {module.module_name}")
+            return None
+
+        # Для не-бридж модулей или если bridge_chain_id не указан
+        return random.choice(available_chains)
+
+    def compile(self, wallet: Wallet, contracts_count: int, wallet_number: int = 0) -> WalletPlan:
+        steps: List[PlanStep] = []
+
+        if not self.snapshot.can_afford_any_module(wallet):
+            logger.warning(f"[Account #{wallet_number}] Not enough balance for any module, empty plan")
+            return WalletPlan(wallet.address, ())
+
+        amount_spec = SETTINGS["RELAY_BRIDGE"]["AMOUNT_PERCENTAGE"]
+        while len(steps) < contracts_count:
+            # Свой порядок модулей для кошелька, общий список не перемешивается
+            modules = list(self.modules)
+            random.shuffle(modules)
+
+            added = 0
+            for module in modules:
+                if len(steps) >= contracts_count:
+                    break
+                destination_chain = self.select_destination_chain(module, wallet, wallet_number)
+                if destination_chain is None:
+                    continue
+                steps.append(PlanStep(module, destination_chain, amount_spec))
+                added += 1
+
+            if not added:
+                logger.error(f"[Account #{wallet_number}] No module has available routes, "
+                             f"planned {len(steps)}/{contracts_count} contracts")
+                break
+
+        return WalletPlan(wallet.address, tuple(steps))
@@ -1,13 +1,18 @@
+import argparse
+import json
 import random
+from contextlib import nullcontext
+from functools import partial
+from itertools import chain, islice
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from loguru import logger
 from pathlib import Path
+from typing import Iterable, Iterator, Tuple
 
 from config.settings import SETTINGS
-from core.wallet_manager import WalletManager
-from modules.lisk_dmail import DmailModule
+from core.wallet_manager import Wallet, WalletManager
+from modules.lisk_dmail import DmailModule, AsyncDmailModule
 from modules.relay_bridge import RelayBridge
 from modules.ionic import IonicModule
 from modules.safe import SafeModule
@@ -16,26 +21,45 @@ from modules.layer_swap import LayerSwapModule
 from modules.superbridge import SuperBridgeModule
 from modules.weth import WethModule
 from core.nonce_manager import NonceManager
-from web3 import Web3
+from core.provider_registry import ProviderRegistry, get_web3
+from core.receipt_watcher import stop_receipt_watchers
+from core.portfolio_snapshot import get_portfolio_snapshot
+from core.route_matrix import RouteMatrix
+from core.wallet_plan import PlanCompiler
+from core.concurrency_limiter import get_concurrency_limiter, get_worker_count
+from core.async_engine import AsyncEngine
+from core.scheduler import StepScheduler, WalletSteps
+from core.tx_pipeline import TxPipeline
+from core.job_journal import get_job_journal, current_run_id
+from core.process_coordinator import ProcessCoordinator
+from core.lease_coordinator import LeaseCoordinator, LeaseClient
 from utils.logger import setup_logging, log_module_start
 from utils.results_tracker import ResultsTracker
 
 
 class DeFiBot:
-    def __init__(self, excel_path: str = "wallets.xlsx"):
-        self.excel_path = excel_path
+    def __init__(self, wallets_path: str = "wallets.xlsx", engine: str = "threads", resume: bool = False,
+                 processes: int = 1, results_tracker=None):
+        self.wallets_path = wallets_path
+        self.engine = engine
+        self.resume = resume
+        self.processes = processes
+        self.journal = get_job_journal()
         self.wallet_counter = 0
+        self.wallet_number_step = 1
         self.wallet_count_lock = threading.Lock()
-        self.results_tracker = ResultsTracker()
+        self.results_tracker = results_tracker or ResultsTracker()
 
         # Инициализация Web3 и NonceManager
-        self.w3 = Web3(Web3.HTTPProvider(SETTINGS["RPC_URL"]))
+        self.w3 = get_web3(SETTINGS["RPC_URL"])
         self.nonce_manager = NonceManager(self.w3)
 
         # Инициализация модулей с передачей nonce_manager
         self.weth_module = WethModule(self.nonce_manager)
+        # В asyncio движке перенесенные модули работают в event loop, остальные - в потоках
+        dmail_module = AsyncDmailModule(self.nonce_manager) if engine == "asyncio" else DmailModule(self.nonce_manager)
         self.modules = [
-            DmailModule(self.nonce_manager),
+            dmail_module,
             RelayBridge(self.nonce_manager),
             IonicModule(self.nonce_manager),
             SafeModule(self.nonce_manager),
@@ -43,26 +67,49 @@ class DeFiBot:
             LayerSwapModule(self.nonce_manager),
             SuperBridgeModule(self.nonce_manager)
         ]
+        self.route_matrix = RouteMatrix(list(self.modules))
+        self.plan_compiler = PlanCompiler(self.modules, self.route_matrix)
+        self.pipeline = TxPipeline(self.results_tracker) if SETTINGS["PIPELINE"]["ENABLED"] else None
+        self.limiter = get_concurrency_limiter()
+        # Клиент координатора в режиме --worker: аренда кошелька может быть потеряна
+        self.lease_client = None
 
     def get_wallet_number(self) -> int:
         with self.wallet_count_lock:
-            self.wallet_counter += 1
+            self.wallet_counter += self.wallet_number_step
             return self.wallet_counter
 
-    def process_wallet(self, wallet):
+    @staticmethod
+    def get_delay(name: str) -> float:
+        return random.uniform(SETTINGS["DELAYS"][name]["MIN"], SETTINGS["DELAYS"][name]["MAX"])
+
+    def is_wallet_lost(self, wallet) -> bool:
+        """Аренда кошелька перешла к другому воркеру - новые транзакции не отправляем"""
+        return self.lease_client is not None and self.lease_client.is_lost(wallet.address)
+
+    def get_processed_count(self, wallet) -> int:
+        """Сколько модулей кошелька уже выполнено (по журналу при --resume и по данным координатора)"""
+        processed = 0
+        if self.journal:
+            self.journal.plan_wallet(wallet.address, wallet.contracts_count)
+            processed = self.journal.finished_runs(wallet.address)
+        if self.lease_client is not None:
+            # Кошелек мог начать другой воркер, чья аренда истекла
+            processed = max(processed, self.lease_client.processed_count(wallet.address))
+        return processed
+
+    def wallet_steps(self, wallet) -> WalletSteps:
+        """Обработка кошелька по шагам: yield возвращает паузу, которую выдерживает планировщик"""
         try:
             wallet_number = self.get_wallet_number()
             contracts_to_process = wallet.contracts_count
+            contracts_processed = self.get_processed_count(wallet)
 
-            # Создаем прокси для всех запросов
-            proxy = None
-            if wallet.proxy:
-                proxy = {
-                    'http': wallet.proxy.as_url(),
-                    'https': wallet.proxy.as_url()
-                }
+            if contracts_processed >= contracts_to_process:
+                logger.info(f"[Account #{wallet_number}] Already processed in previous run, skipping")
+                return
 
-            logger.info(f"[Account #{wallet_number}] Planning to process {contracts_to_process} contracts")
+            logger.info(f"[Account #{wallet_number}] Planning to process {contracts_to_process - contracts_processed} contracts")
 
             # Проверяем и выводим WETH если есть
             weth_result = self.weth_module.check_and_withdraw_weth(wallet, wallet_number)
@@ -71,115 +118,290 @@ class DeFiBot:
 
             # Добавляем задержку между кошельками
             if wallet_number > 1:
-                delay = random.uniform(
-                    SETTINGS["DELAYS"]["BETWEEN_WALLETS"]["MIN"],
-                    SETTINGS["DELAYS"]["BETWEEN_WALLETS"]["MAX"]
-                )
+                delay = self.get_delay("BETWEEN_WALLETS")
                 logger.info(f"[Account #{wallet_number}] Waiting {delay:.2f} seconds before processing")
-                time.sleep(delay)
+                yield delay
 
-            # Обрабатываем контракты
-            contracts_processed = 0
-            while contracts_processed < contracts_to_process:
-                random.shuffle(self.modules)
+            # План компилируется один раз, дальше только выполнение шагов
+            plan = self.plan_compiler.compile(wallet, contracts_to_process - contracts_processed, wallet_number)
 
-                for module in self.modules:
-                    if contracts_processed >= contracts_to_process:
-                        break
+            for index, step in enumerate(plan.steps):
+                module, destination_chain = step.module, step.destination_chain
+                log_module_start(module.module_name, wallet_number)
 
-                    log_module_start(module.module_name, wallet_number)
-
-                    available_chains = module.get_available_chains(wallet_number, proxy)
-
-                    if not available_chains:
-                        logger.error(f"[Account #{wallet_number}] No available chains for {module.module_name}")
-                        continue
-
-                    # Проверяем bridge_chain_id только для бридж модулей
-                    is_bridge_module = isinstance(module,
-                                                  (RelayBridge, JumperModule, LayerSwapModule, SuperBridgeModule))
-
-                    # Выбор сети на основе bridge_chain_id только для бриджей
-                    if is_bridge_module and wallet.bridge_chain_id is not None:
-                        # Ищем указанную сеть среди доступных
-                        destination_chain = next(
-                            (chain for chain in available_chains if chain.id == wallet.bridge_chain_id),
-                            None
-                        )
-                        # Если указанная сеть недоступна для бриджа, пропускаем этот модуль
-                        if destination_chain is None:
-                            logger.warning(
-                                f"[Account #{wallet_number}] Specified chain {wallet.bridge_chain_id} not available for {module.module_name}, skipping")
-                            continue
-                    else:
-                        # Для не-бридж модулей или если bridge_chain_id не указан
-                        destination_chain = random.choice(available_chains)
+                # Добавляем задержку между транзакциями
+                delay = self.get_delay("BETWEEN_TRANSACTIONS")
+                logger.info(f"[Account #{wallet_number}] Waiting {delay:.2f} seconds before transaction")
+                yield delay
 
-                    # Добавляем задержку между транзакциями
-                    delay = random.uniform(
-                        SETTINGS["DELAYS"]["BETWEEN_TRANSACTIONS"]["MIN"],
-                        SETTINGS["DELAYS"]["BETWEEN_TRANSACTIONS"]["MAX"]
-                    )
-                    logger.info(f"[Account #{wallet_number}] Waiting {delay:.2f} seconds before transaction")
-                    time.sleep(delay)
+                if self.is_wallet_lost(wallet):
+                    logger.warning(f"[Account #{wallet_number}] Lease lost, wallet stopped")
+                    return
+
+                # Обработка транзакции
+                logger.info(f"[Account #{wallet_number}] Selected chain: {destination_chain.name}")
+                run_id = self.journal.begin_run(
+                    wallet.address, module.module_name, destination_chain.id, module.expected_transactions
+                ) if self.journal else None
 
-                    # Обработка транзакции
-                    logger.info(f"[Account #{wallet_number}] Selected chain: {destination_chain.name}")
-                    result = module.process_transaction(
+                if self.pipeline is not None and module.supports_pipeline:
+                    # Конвейер сам отправит, дождется receipt и запишет результат
+                    yield self.pipeline.submit(
+                        module,
                         wallet,
                         destination_chain,
-                        SETTINGS["RELAY_BRIDGE"]["AMOUNT_PERCENTAGE"],
-                        wallet_number
+                        step.amount_spec,
+                        wallet_number,
+                        run_id
                     )
+                else:
+                    # Хеши транзакций модуля попадут в журнал под этим запуском
+                    token = current_run_id.set(run_id)
+                    try:
+                        # Число одновременно выполняемых модулей подстраивается под отклик RPC
+                        with self.limiter.slot() if self.limiter else nullcontext():
+                            result = module.process_transaction(
+                                wallet,
+                                destination_chain,
+                                step.amount_spec,
+                                wallet_number
+                            )
+                    finally:
+                        current_run_id.reset(token)
 
                     # Обновление результатов
+                    if self.journal:
+                        self.journal.finish_run(run_id, result)
                     self.results_tracker.update_results(wallet, destination_chain, result)
-                    contracts_processed += 1
-                    logger.info(
-                        f"[Account #{wallet_number}] Processed {contracts_processed}/{contracts_to_process} contracts")
-
-                    # Добавляем задержку между модулями
-                    if contracts_processed < contracts_to_process:
-                        delay = random.uniform(
-                            SETTINGS["DELAYS"]["BETWEEN_MODULES"]["MIN"],
-                            SETTINGS["DELAYS"]["BETWEEN_MODULES"]["MAX"]
-                        )
-                        logger.info(f"[Account #{wallet_number}] Waiting {delay:.2f} seconds before next module")
-                        time.sleep(delay)
+                contracts_processed += 1
+                logger.info(
+                    f"[Account #{wallet_number}] Processed {contracts_processed}/{contracts_to_process} contracts")
+
+                # Добавляем задержку между модулями
+                if index < len(plan.steps) - 1:
+                    delay = self.get_delay("BETWEEN_MODULES")
+                    logger.info(f"[Account #{wallet_number}] Waiting {delay:.2f} seconds before next module")
+                    yield delay
 
         except Exception as e:
            logger.error(f"[Account #{wallet_number}] Error processing wallet {wallet.address}: {str(e)}")
+        finally:
+            # Запись снимка больше не нужна - память не растет с числом кошельков
+            get_portfolio_snapshot().invalidate(wallet.address)
+
+    def build_snapshot(self, wallets: list) -> list:
+        """Снимок балансов части кошельков и отсев тех, кому не хватает средств ни на один модуль"""
+        snapshot = get_portfolio_snapshot()
+        try:
+            snapshot.build(wallets)
+        except Exception as e:
+            logger.warning(f"Failed to build balance snapshot, balances will be fetched per wallet: {str(e)}")
+            return wallets
+
+        affordable = [wallet for wallet in wallets if snapshot.can_afford_any_module(wallet)]
+        if len(affordable) < len(wallets):
+            logger.warning(f"Skipping {len(wallets) - len(affordable)} wallets without ETH/WETH balance")
+        return affordable
+
+    def affordable_wallets(self, wallets: Iterable[Wallet], on_wallet_done=None) -> Iterator[Wallet]:
+        """Снимок строится частями по мере того, как движок забирает кошельки"""
+        iterator = iter(wallets)
+        while True:
+            chunk = list(islice(iterator, SETTINGS["WALLET_LOADER"]["CHUNK_SIZE"]))
+            if not chunk:
+                return
+
+            affordable = self.build_snapshot(chunk)
+            if on_wallet_done is not None:
+                # Отсеянные кошельки тоже считаются обработанными
+                affordable_ids = {id(wallet) for wallet in affordable}
+                for wallet in chunk:
+                    if id(wallet) not in affordable_ids:
+                        on_wallet_done(wallet)
+            yield from affordable
+
+    def iter_wallets(self, shard: Tuple[int, int] = None) -> Iterator[Wallet]:
+        return WalletManager.iter_wallets(self.wallets_path, shard=shard)
+
+    def prepare(self) -> Iterator[Wallet]:
+        """Сверка сети и журнала (один раз, до запуска процессов), кошельки читаются потоком"""
+        # Константы сети загружаются один раз и сверяются с конфигом
+        ProviderRegistry.verify_chain(SETTINGS["RPC_URL"], SETTINGS["CHAIN_ID"])
+
+        if self.journal:
+            if self.resume:
+                # Висящие хеши прошлого запуска сверяются с сетью до планирования
+                self.journal.reconcile(self.w3)
+            else:
+                self.journal.reset()
+
+        return self.iter_wallets()
+
+    def reported_steps(self, wallet, on_wallet_done) -> WalletSteps:
+        yield from self.wallet_steps(wallet)
+        try:
+            on_wallet_done(wallet)
+        except Exception as e:
+            logger.error(f"Failed to report completion of {wallet.address}: {str(e)}")
+
+    def start_services(self):
+        """Фоновые сервисы на весь запуск процесса, а не на каждую пачку кошельков"""
+        # Доступные маршруты одинаковы для всех кошельков - строим матрицу один раз
+        self.route_matrix.start()
+        if self.engine != "asyncio" and self.pipeline is not None:
+            self.pipeline.start()
+
+    def stop_services(self):
+        if self.engine != "asyncio" and self.pipeline is not None:
+            self.pipeline.stop()
+        self.route_matrix.stop()
+        stop_receipt_watchers()
+        ProviderRegistry.log_stats()
+
+    def execute(self, wallets: Iterable[Wallet], on_wallet_done=None):
+        """
+        Обработка кошельков в текущем процессе, on_wallet_done вызывается для каждого завершенного кошелька.
+        Кошельки забираются из итератора по мере освобождения мест в движке. Сервисы запускает
+        вызывающий (start_services / stop_services).
+        """
+        if SETTINGS["SNAPSHOT"]["ENABLED"]:
+            wallets = self.affordable_wallets(wallets, on_wallet_done)
+
+        logger.info("Starting process. Wait...")
+
+        if self.engine == "asyncio":
+            AsyncEngine(self).run(wallets, on_wallet_done)
+        else:
+            # Паузы не занимают потоки: воркеры выполняют только наступившие шаги
+            scheduler = StepScheduler(get_worker_count(), SETTINGS["SCHEDULER"]["MAX_ACTIVE_WALLETS"])
+            if on_wallet_done is None:
+                scheduler.run(self.wallet_steps(wallet) for wallet in wallets)
+            else:
+                scheduler.run(self.reported_steps(wallet, on_wallet_done) for wallet in wallets)
+
+    def run_local(self, wallets: Iterable[Wallet]):
+        """Обработка кошельков в текущем процессе вместе с запуском и остановкой сервисов"""
+        self.start_services()
+        try:
+            self.execute(wallets)
+        finally:
+            self.stop_services()
+
+    def dump_plans(self, path: str):
+        """Компиляция планов всех кошельков в JSON Lines без выполнения (для анализа офлайн)"""
+        self.route_matrix.refresh()
+
+        count = 0
+        with open(path, "w", encoding="utf-8") as file:
+            for count, wallet in enumerate(self.iter_wallets(), start=1):
+                plan = self.plan_compiler.compile(wallet, wallet.contracts_count, count)
+                file.write(json.dumps(plan.to_dict()) + "\n")
+
+        logger.info(f"Plans for {count} wallets saved to {path}")
+
+    def run_worker(self, client: LeaseClient):
+        """Режим --worker: кошельки берутся в аренду у координатора пачками"""
+        wallets = {wallet.address.lower(): wallet for wallet in self.prepare()}
+        if not wallets:
+            logger.error("No wallets loaded")
+            return
+
+        def on_wallet_done(wallet):
+            # Потерянный кошелек уже у другого воркера - завершать его нельзя
+            if client.is_lost(wallet.address):
+                client.release(wallet.address)
+            else:
+                client.complete(wallet.address)
+
+        self.lease_client = client
+        client.start_heartbeat()
+        self.start_services()
+        try:
+            while True:
+                claim = client.claim(SETTINGS["SCHEDULER"]["MAX_ACTIVE_WALLETS"])
+                if not claim["wallets"]:
+                    if claim["finished"]:
+                        break
+                    # Свободных кошельков нет, но аренды других воркеров еще могут истечь
+                    time.sleep(SETTINGS["COORDINATOR"]["CLAIM_RETRY_INTERVAL"])
+                    continue
+
+                batch = []
+                for address in claim["wallets"]:
+                    if address in wallets:
+                        batch.append(wallets[address])
+                    else:
+                        # Аренда не продлевается и кошелек достанется воркеру, у которого он есть
+                        client.release(address)
+                        logger.error(f"Wallet {address} from coordinator is not in {self.wallets_path}")
+
+                self.execute(batch, on_wallet_done=on_wallet_done)
+        finally:
+            self.stop_services()
+            client.stop_heartbeat()
 
     def run(self):
         try:
             setup_logging()
-            wallets = WalletManager.load_wallets(self.excel_path)
 
-            if not wallets:
+            wallets = self.prepare()
+            self.results_tracker.begin_run(self.resume)
+
+            first_wallet = next(wallets, None)
+            if first_wallet is None:
                 logger.error("No wallets loaded")
                 return
 
-            logger.info(f"Starting process with {len(wallets)} wallets. Wait...")
-
-            with ThreadPoolExecutor(max_workers=SETTINGS["MAX_THREADS"]) as executor:
-                futures = [
-                    executor.submit(self.process_wallet, wallet)
-                    for wallet in wallets
-                ]
-
-                for future in as_completed(futures):
-                    future.result()
+            if self.processes > 1:
+                # Кошельки шардируются по адресу, каждый процесс сам читает свою часть файла
+                bot_factory = partial(type(self), self.wallets_path, engine=self.engine, resume=self.resume)
+                ProcessCoordinator(bot_factory, self.processes, self.results_tracker).run()
+            else:
+                self.run_local(chain([first_wallet], wallets))
 
         except Exception as e:
             logger.error(f"Critical error in run(): {str(e)}")
             raise
+        finally:
+            # results.xlsx собирается из журнала результатов один раз при выходе
+            self.results_tracker.save_results()
 
 
 if __name__ == "__main__":
     try:
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--engine", choices=["threads", "asyncio"], default="threads",
+                            help="threads - пул потоков MAX_THREADS, asyncio - event loop на тысячи кошельков")
+        parser.add_argument("--resume", action="store_true",
+                            help="продолжить прерванный запуск по журналу, без повтора выполненных модулей")
+        parser.add_argument("--processes", type=int, default=1,
+                            help="число процессов, между которыми шардируются кошельки")
+        parser.add_argument("--coordinator", action="store_true",
+                            help="раздавать кошельки воркерам на других хостах (COORDINATOR в настройках)")
+        parser.add_argument("--worker", metavar="URL",
+                            help="работать воркером координатора, например http://10.0.0.1:8765")
+        parser.add_argument("--wallets", metavar="PATH", default="wallets.xlsx",
+                            help="файл кошельков: .xlsx, .csv или .parquet")
+        parser.add_argument("--dump-plans", metavar="PATH",
+                            help="сохранить планы кошельков в JSON Lines и выйти без отправки транзакций")
+        args = parser.parse_args()
+
         Path("logs").mkdir(exist_ok=True)
-        bot = DeFiBot("wallets.xlsx")
-        bot.run()
+        if args.dump_plans:
+            setup_logging()
+            DeFiBot(args.wallets, engine=args.engine).dump_plans(args.dump_plans)
+        elif args.coordinator:
+            setup_logging()
+            results_tracker = ResultsTracker()
+            results_tracker.begin_run(args.resume)
+            LeaseCoordinator(WalletManager.iter_wallets(args.wallets), results_tracker).serve()
+        elif args.worker:
+            setup_logging()
+            client = LeaseClient(args.worker)
+            DeFiBot(args.wallets, engine=args.engine, resume=args.resume, results_tracker=client).run_worker(client)
+        else:
+            bot = DeFiBot(args.wallets, engine=args.engine, resume=args.resume, processes=args.processes)
+            bot.run()
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
@@ -1,17 +1,21 @@
 from core.base_module import BaseModule
+from core.provider_registry import get_web3
+from core.multicall import ContractCall, get_multicall
 from core.wallet_manager import Wallet, Chain, TransactionResult
 from core.nonce_manager import NonceManager
 from config.settings import SETTINGS
-from web3 import Web3
 from utils.logger import log_transaction_start, log_transaction_success, log_transaction_error, log_status
 import random
 from config.constants import *
 
 
 class IonicModule(BaseModule):
+    # approve и supply
+    expected_transactions = 2
+
     def __init__(self, nonce_manager: NonceManager):
         super().__init__(nonce_manager)
-        self.w3 = Web3(Web3.HTTPProvider(RPC_URL))
+        self.w3 = get_web3(RPC_URL)
         self.settings = SETTINGS["IONIC"]
 
     def get_available_chains(self, wallet_number: int = None, proxy: dict = None):
@@ -26,24 +30,39 @@ class IonicModule(BaseModule):
             )
         ]
 
-    def check_token_balance(self, wallet: Wallet, token_address: str, token_contract) -> float:
-        """Проверка баланса токена"""
-        balance = token_contract.functions.balanceOf(wallet.address).call()
-        decimals = token_contract.functions.decimals().call()
-        return float(balance) / (10 ** decimals)  # Конвертация из wei
-
     def get_available_tokens(self, wallet: Wallet, wallet_number: int) -> list:
-        """Получение списка доступных токенов с достаточным балансом"""
+        """Получение списка доступных токенов с достаточным балансом (снимок или один multicall)"""
         log_status(wallet_number, "Checking available tokens for Ionic")
         available_tokens = []
 
+        tokens = []
+        calls = []
+        raw_balances = {}
         for token_symbol, token_data in self.settings["TOKENS"].items():
-            token_contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(token_data["ADDRESS"]),
-                abi=self.settings["ABI"]["TOKEN"]
-            )
-
-            balance = self.check_token_balance(wallet, token_data["ADDRESS"], token_contract)
+            token_contract = self.contracts.get_contract(token_data["ADDRESS"], self.settings["ABI"]["TOKEN"])
+            tokens.append((token_symbol, token_data, token_contract))
+
+            # Сначала берем баланс из снимка, в multicall идут только недостающие токены
+            snapshot_balance = self.snapshot.get_token_balance(wallet.address, token_data["ADDRESS"])
+            snapshot_decimals = self.snapshot.get_token_decimals(token_data["ADDRESS"])
+            if snapshot_balance is not None and snapshot_decimals is not None:
+                raw_balances[token_symbol] = (snapshot_balance, snapshot_decimals)
+            else:
+                calls.append(ContractCall(token_contract, "balanceOf", (wallet.address,)))
+                calls.append(ContractCall(token_contract, "decimals"))
+
+        results = iter(get_multicall().call(calls) if calls else [])
+
+        for token_symbol, token_data, token_contract in tokens:
+            if token_symbol not in raw_balances:
+                balance_result, decimals_result = next(results), next(results)
+                if not balance_result.success or not decimals_result.success:
+                    log_status(wallet_number, f"Failed to read {token_symbol} balance, skipping")
+                    continue
+                raw_balances[token_symbol] = (balance_result.value, decimals_result.value)
+
+            raw_balance, decimals = raw_balances[token_symbol]
+            balance = float(raw_balance) / (10 ** decimals)  # Конвертация из wei
             log_status(wallet_number, f"Token {token_symbol} balance: {balance:.6f}")
 
             if balance >= token_data["MIN_AMOUNT"]:
@@ -51,6 +70,7 @@ class IonicModule(BaseModule):
                     "symbol": token_symbol,
                     "address": token_data["ADDRESS"],
                     "balance": balance,
+                    "decimals": decimals,
                     "contract": token_contract,
                     "data": token_data
                 })
@@ -62,37 +82,28 @@ class IonicModule(BaseModule):
         try:
             log_transaction_start(wallet_number, "Approving token for Ionic supply")
 
-            tx = token_contract.functions.approve(
-                spender_address,
-                amount * 18**10
-            ).build_transaction({
-                "from": wallet.address,
-                "gasPrice": self.w3.eth.gas_price,
-                "chainId": self.w3.eth.chain_id
-            })
-
-            # Получаем nonce через NonceManager
-            tx = self.prepare_transaction(wallet, tx)
-
-            tx["gas"] = int(self.w3.eth.estimate_gas(tx) * 1.5)
+            # Оценка газа и nonce из NonceManager
+            tx = self.build_contract_transaction(
+                wallet, token_contract, "approve", (spender_address, amount * 18**10), gas_multiplier=1.5
+            )
 
             try:
-                signed_tx = self.w3.eth.account.sign_transaction(tx, wallet.private_key)
+                signed_tx = self.sign_transaction(wallet, tx, preflight=False)
                 tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-
-                if receipt["status"] == 1:
-                    log_transaction_success(wallet_number, tx_hash.hex(), "Token approval for Ionic")
-                    return True
-                else:
-                    self.handle_failed_transaction(wallet, tx)
-                    log_transaction_error(wallet_number, "Token approval failed", "Ionic approval")
-                    return False
 
             except Exception as e:
-                self.handle_failed_transaction(wallet, tx)
+                self.handle_failed_transaction(wallet, tx, e)
                 raise e
 
+            receipt = self.wait_for_receipt(tx_hash)
+
+            if receipt["status"] == 1:
+                log_transaction_success(wallet_number, tx_hash.hex(), "Token approval for Ionic")
+                return True
+            else:
+                log_transaction_error(wallet_number, "Token approval failed", "Ionic approval")
+                return False
+
         except Exception as e:
             log_transaction_error(wallet_number, str(e), "Ionic approval")
             return False
@@ -114,17 +125,14 @@ class IonicModule(BaseModule):
             log_status(wallet_number, f"Selected token for Ionic supply: {token['symbol']}")
 
             # Создаем контракт для supply
-            supply_contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(token["data"]["SUPPLY_CONTRACT"]),
-                abi=self.settings["ABI"]["SUPPLY"]
-            )
+            supply_contract = self.contracts.get_contract(token["data"]["SUPPLY_CONTRACT"], self.settings["ABI"]["SUPPLY"])
 
             # Определяем сумму для supply
             balance = token["balance"]
             supply_amount = int(random.uniform(
                 balance * token["data"]["MIN_AMOUNT"],
                 balance * min(token["data"]["MAX_AMOUNT"], token["balance"])
-            ) * (10 ** token["contract"].functions.decimals().call()))
+            ) * (10 ** token["decimals"]))
 
             # Делаем approve
             if not self.approve_token(
@@ -142,53 +150,43 @@ class IonicModule(BaseModule):
 
             log_status(
                 wallet_number,
-                f"Supplying {supply_amount / (10 ** token['contract'].functions.decimals().call())} {token['symbol']} to Ionic"
+                f"Supplying {supply_amount / (10 ** token['decimals'])} {token['symbol']} to Ionic"
             )
 
             # Делаем supply
-            tx = supply_contract.functions.mint(
-                supply_amount
-            ).build_transaction({
-                "from": wallet.address,
-                "gasPrice": self.w3.eth.gas_price,
-                "chainId": self.w3.eth.chain_id
-            })
-
-            # Получаем nonce через NonceManager
-            tx = self.prepare_transaction(wallet, tx)
-
-            tx["gas"] = int(self.w3.eth.estimate_gas(tx) * 1.5)
+            tx = self.build_contract_transaction(
+                wallet, supply_contract, "mint", (supply_amount,), gas_multiplier=1.5
+            )
 
             try:
-                signed_tx = self.w3.eth.account.sign_transaction(tx, wallet.private_key)
+                signed_tx = self.sign_transaction(wallet, tx, preflight=False)
                 tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
-                log_status(wallet_number, "Waiting for Ionic supply transaction confirmation")
-
-                # Ждем подтверждения транзакции
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-
-                if receipt["status"] == 1:
-                    log_transaction_success(wallet_number, tx_hash.hex(), "Ionic supply")
-                    return TransactionResult(
-                        success=True,
-                        tx_hash=tx_hash.hex(),
-                        module_name=self.module_name
-                    )
-                else:
-                    self.handle_failed_transaction(wallet, tx)
-                    log_transaction_error(wallet_number, "Transaction failed", "Ionic supply")
-                    return TransactionResult(
-                        success=False,
-                        tx_hash=tx_hash.hex(),
-                        error_message="Transaction failed",
-                        module_name=self.module_name
-                    )
-
             except Exception as e:
-                self.handle_failed_transaction(wallet, tx)
+                self.handle_failed_transaction(wallet, tx, e)
                 raise e
 
+            log_status(wallet_number, "Waiting for Ionic supply transaction confirmation")
+
+            # Ждем подтверждения транзакции
+            receipt = self.wait_for_receipt(tx_hash)
+
+            if receipt["status"] == 1:
+                log_transaction_success(wallet_number, tx_hash.hex(), "Ionic supply")
+                return TransactionResult(
+                    success=True,
+                    tx_hash=tx_hash.hex(),
+                    module_name=self.module_name
+                )
+            else:
+                log_transaction_error(wallet_number, "Transaction failed", "Ionic supply")
+                return TransactionResult(
+                    success=False,
+                    tx_hash=tx_hash.hex(),
+                    error_message="Transaction failed",
+                    module_name=self.module_name
+                )
+
         except Exception as e:
             error_message = str(e)
             log_transaction_error(wallet_number, error_message, "Ionic supply")
@@ -1,18 +1,24 @@
 from core.base_module import BaseModule
+from core.provider_registry import get_web3
+from core.chain_registry import get_chain_registry
 from core.wallet_manager import Wallet, Chain, TransactionResult
 from config.settings import SETTINGS
-from web3 import Web3
 from utils.logger import log_transaction_start, log_transaction_success, log_transaction_error, log_status
 import random
-import requests
 from config.constants import *
 from core.nonce_manager import NonceManager
+from utils.address import to_checksum
 
 
 class JumperModule(BaseModule):
+    # Учитывает bridge_chain_id кошелька
+    is_bridge = True
+    # Бридж и, если не хватает allowance, approve - задается в validate_balance
+    expected_transactions = None
+
     def __init__(self, nonce_manager: NonceManager):
         super().__init__(nonce_manager)
-        self.w3 = Web3(Web3.HTTPProvider(SETTINGS["RPC_URL"]))
+        self.w3 = get_web3()
         self.settings = SETTINGS["JUMPER"]
         self.headers = {
             'x-lifi-integrator': 'jumper.exchange',
@@ -27,7 +33,7 @@ class JumperModule(BaseModule):
                 'Referer': 'https://jumper.exchange/',
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            routes_response = requests.get('https://api.jumper.exchange/p/lifi/tools', headers=headers, proxies=proxy)
+            routes_response = self.http.get('https://api.jumper.exchange/p/lifi/tools', headers=headers, proxies=proxy)
             routes_data = routes_response.json()
 
             # Собираем chain_ids
@@ -40,12 +46,10 @@ class JumperModule(BaseModule):
                         available_chain_ids.add(route["fromChainId"])
 
             available_chains = []
+            chain_registry = get_chain_registry()
             for chain_id in available_chain_ids:
                 if chain_id != 1:
-                    chain_info_response = requests.get(f'https://chainid.network/chains.json', proxies=proxy)
-                    chains_data = chain_info_response.json()
-
-                    chain_info = next((chain for chain in chains_data if chain["chainId"] == chain_id), None)
+                    chain_info = chain_registry.get(chain_id, proxy)
 
                     if chain_info and chain_info['nativeCurrency']['symbol'] == 'ETH':
                         available_chains.append(
@@ -71,12 +75,9 @@ class JumperModule(BaseModule):
         log_status(wallet_number, "Validating balance for Jumper")
 
         if self.settings["FROM_TOKEN"] != '0x0000000000000000000000000000000000000000':
-            token_contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(self.settings["FROM_TOKEN"]),
-                abi=self.settings["TOKEN_ABI"]
-            )
+            token_contract = self.contracts.get_contract(self.settings["FROM_TOKEN"], self.settings["TOKEN_ABI"])
 
-            balance = token_contract.functions.balanceOf(wallet.address).call()
+            balance = self.get_token_balance(wallet.address, token_contract)
 
             # Проверяем апрув
             allowance = token_contract.functions.allowance(
@@ -84,6 +85,7 @@ class JumperModule(BaseModule):
                 self.settings["SPENDER_ADDRESS"]
             ).call()
 
+            self.expect_transactions(2 if allowance < balance else 1)
             if allowance < balance:
                 log_transaction_start(wallet_number, "Approving token for Jumper")
 
@@ -92,24 +94,31 @@ class JumperModule(BaseModule):
                     2 ** 256 - 1
                 ).build_transaction({
                     "from": wallet.address,
-                    "nonce": self.w3.eth.get_transaction_count(wallet.address),
-                    "gasPrice": self.w3.eth.gas_price,
+                    **self.fee_oracle.get_fee_fields(),
                     "chainId": self.w3.eth.chain_id
                 })
 
-                approve_tx["gas"] = int(self.w3.eth.estimate_gas(approve_tx) * 1.5)
-                signed_tx = self.w3.eth.account.sign_transaction(approve_tx, wallet.private_key)
-                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+                # Получаем nonce через NonceManager
+                approve_tx = self.prepare_transaction(wallet, approve_tx)
+
+                try:
+                    approve_tx["gas"] = self.estimate_gas(approve_tx, 1.5)
+                    signed_tx = self.sign_transaction(wallet, approve_tx, preflight=False)
+                    tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                except Exception as e:
+                    self.handle_failed_transaction(wallet, approve_tx, e)
+                    raise e
 
                 log_transaction_success(wallet_number, tx_hash.hex(), "Token approval for Jumper")
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+                receipt = self.wait_for_receipt(tx_hash)
 
             self.value = int(balance * (random.randint(
                 self.settings["AMOUNT_PERCENTAGE"]["MIN"],
                 self.settings["AMOUNT_PERCENTAGE"]["MAX"]
             ) / 100))
         else:
-            balance = self.w3.eth.get_balance(wallet.address)
+            self.expect_transactions(1)
+            balance = self.get_eth_balance(wallet.address)
             self.value = int(balance * (random.uniform(
                 self.settings["AMOUNT_PERCENTAGE"]["MIN"],
                 self.settings["AMOUNT_PERCENTAGE"]["MAX"]
@@ -135,7 +144,7 @@ class JumperModule(BaseModule):
             },
         }
 
-        response = requests.post(
+        response = self.http.post(
             'https://li.quest/v1/advanced/routes',
             headers=self.headers,
             json=json_data
@@ -160,36 +169,42 @@ class JumperModule(BaseModule):
             log_status(wallet_number, "Preparing Jumper transaction data")
 
             # Получаем данные для транзакции
-            tx_data = requests.post(
+            tx_data = self.http.post(
                 'https://li.quest/v1/advanced/stepTransaction',
                 json=route["steps"][0]
             ).json()["transactionRequest"]["data"]
 
             # Создаем транзакцию
             tx = {
-                "to": self.w3.to_checksum_address(self.settings["SPENDER_ADDRESS"]),
+                "to": to_checksum(self.settings["SPENDER_ADDRESS"]),
                 "data": tx_data,
                 "value": self.value if self.settings[
                                            "FROM_TOKEN"] == '0x0000000000000000000000000000000000000000' else 0,
                 "chainId": self.w3.eth.chain_id,
-                "nonce": self.w3.eth.get_transaction_count(wallet.address),
-                "gasPrice": self.w3.eth.gas_price,
+                **self.fee_oracle.get_fee_fields(),
                 "from": wallet.address
             }
 
-            # Оценка газа
-            tx["gas"] = int(self.w3.eth.estimate_gas(tx) * 1.5)
+            # Получаем nonce через NonceManager
+            tx = self.prepare_transaction(wallet, tx)
+
+            try:
+                # Оценка газа
+                tx["gas"] = self.estimate_gas(tx, 1.5)
 
-            log_status(wallet_number, "Signing and sending Jumper transaction")
+                log_status(wallet_number, "Signing and sending Jumper transaction")
 
-            # Подписываем и отправляем транзакцию
-            signed_tx = self.w3.eth.account.sign_transaction(tx, wallet.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                # Подписываем и отправляем транзакцию
+                signed_tx = self.sign_transaction(wallet, tx, preflight=False)
+                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                self.handle_failed_transaction(wallet, tx, e)
+                raise e
 
             log_status(wallet_number, "Waiting for Jumper transaction confirmation")
 
             # Ждем подтверждения
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.wait_for_receipt(tx_hash)
 
             if receipt["status"] == 1:
                 log_transaction_success(wallet_number, tx_hash.hex(), "Jumper bridge transaction")
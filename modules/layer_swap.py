@@ -1,18 +1,22 @@
 from core.base_module import BaseModule
+from core.provider_registry import get_web3
 from core.wallet_manager import Wallet, Chain, TransactionResult
 from core.nonce_manager import NonceManager
 from config.settings import SETTINGS
 from web3 import Web3
 from utils.logger import log_transaction_start, log_transaction_success, log_transaction_error, log_status
-import requests
 import random
 from config.constants import *
+from utils.address import to_checksum
 
 
 class LayerSwapModule(BaseModule):
+    # Учитывает bridge_chain_id кошелька
+    is_bridge = True
+
     def __init__(self, nonce_manager: NonceManager):
         super().__init__(nonce_manager)
-        self.w3 = Web3(Web3.HTTPProvider(SETTINGS["RPC_URL"]))
+        self.w3 = get_web3()
         self.settings = SETTINGS["LAYERSWAP"]
         self.headers = {"X-LS-APIKEY": self.settings["API_KEY"]}
         self.networks = self.settings["TO_CHAIN"]
@@ -22,7 +26,7 @@ class LayerSwapModule(BaseModule):
         try:
             log_transaction_start(wallet_number, "Checking Layerswap bridge availability")
 
-            balance = self.w3.eth.get_balance(wallet.address)
+            balance = self.get_eth_balance(wallet.address)
             balance_eth = float(Web3.from_wei(balance, 'ether'))
 
             # Определяем сумму для бриджа
@@ -52,19 +56,18 @@ class LayerSwapModule(BaseModule):
             # Создаем транзакцию
             transaction = {
                 "from": wallet.address,
-                "to": self.w3.to_checksum_address(tx_data["to_address"]),
+                "to": to_checksum(tx_data["to_address"]),
                 "value": Web3.to_wei(amount_to_bridge, 'ether'),
-                "gasPrice": self.w3.eth.gas_price,
+                **self.fee_oracle.get_fee_fields(),
                 "chainId": self.w3.eth.chain_id
             }
 
+            # Оценка газа до выдачи nonce - при ошибке оценки nonce не занимается
+            transaction["gas"] = self.estimate_gas(transaction, 1.5)
+
             # Получаем nonce через NonceManager
             transaction = self.prepare_transaction(wallet, transaction)
 
-            # Оценка газа
-            estimated_gas = self.w3.eth.estimate_gas(transaction)
-            transaction["gas"] = int(estimated_gas * 1.5)
-
             log_status(
                 wallet_number,
                 f"Bridging {amount_to_bridge:.6f} ETH to {destination_chain.name}"
@@ -72,33 +75,32 @@ class LayerSwapModule(BaseModule):
 
             try:
                 # Подписываем и отправляем транзакцию
-                signed_tx = self.w3.eth.account.sign_transaction(transaction, wallet.private_key)
+                signed_tx = self.sign_transaction(wallet, transaction, preflight=False)
                 tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
-                # Ждем подтверждения
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-
-                if receipt["status"] == 1:
-                    log_transaction_success(wallet_number, tx_hash.hex(), "Layerswap bridge transaction")
-                    return TransactionResult(
-                        success=True,
-                        tx_hash=tx_hash.hex(),
-                        module_name=self.module_name
-                    )
-                else:
-                    self.handle_failed_transaction(wallet, transaction)
-                    log_transaction_error(wallet_number, "Transaction failed", "Layerswap bridge transaction")
-                    return TransactionResult(
-                        success=False,
-                        tx_hash=tx_hash.hex(),
-                        error_message="Transaction failed",
-                        module_name=self.module_name
-                    )
-
             except Exception as e:
-                self.handle_failed_transaction(wallet, transaction)
+                self.handle_failed_transaction(wallet, transaction, e)
                 raise e
 
+            # Ждем подтверждения
+            receipt = self.wait_for_receipt(tx_hash)
+
+            if receipt["status"] == 1:
+                log_transaction_success(wallet_number, tx_hash.hex(), "Layerswap bridge transaction")
+                return TransactionResult(
+                    success=True,
+                    tx_hash=tx_hash.hex(),
+                    module_name=self.module_name
+                )
+            else:
+                log_transaction_error(wallet_number, "Transaction failed", "Layerswap bridge transaction")
+                return TransactionResult(
+                    success=False,
+                    tx_hash=tx_hash.hex(),
+                    error_message="Transaction failed",
+                    module_name=self.module_name
+                )
+
         except Exception as e:
             error_message = str(e)
             log_transaction_error(wallet_number, error_message, "Layerswap bridge transaction")
@@ -129,7 +131,7 @@ class LayerSwapModule(BaseModule):
             }
 
             try:
-                response = requests.get(
+                response = self.http.get(
                     "https://api.layerswap.io/api/available_routes",
                     params=params,
                     proxies=proxy
@@ -165,7 +167,7 @@ class LayerSwapModule(BaseModule):
         }
 
         try:
-            response = requests.post(
+            response = self.http.post(
                 "https://api.layerswap.io/api/swap_rate",
                 json=params
             )
@@ -191,7 +193,7 @@ class LayerSwapModule(BaseModule):
             "destination_address": wallet.address
         }
 
-        response = requests.post(
+        response = self.http.post(
             "https://api.layerswap.io/api/swaps",
             headers=self.headers,
             json=params
@@ -203,7 +205,7 @@ class LayerSwapModule(BaseModule):
         swap_id = response.json()["data"]["swap_id"]
 
         params = {"from_address": wallet.address}
-        response = requests.get(
+        response = self.http.get(
             f"https://api.layerswap.io/api/swaps/{swap_id}/prepare_src_transaction",
             headers=self.headers,
             params=params
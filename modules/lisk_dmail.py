@@ -1,24 +1,22 @@
 from core.base_module import BaseModule
+from core.async_base_module import AsyncBaseModule
+from core.provider_registry import get_web3
 from core.wallet_manager import Wallet, Chain, TransactionResult
 from core.nonce_manager import NonceManager
+from core.signer import get_signer
+from core.contract_factory import get_contract_factory
 from config.settings import SETTINGS
 from config.constants import *
 from faker import Faker
 from hashlib import sha256
+import asyncio
 import random
 from utils.logger import log_transaction_start, log_transaction_success, log_transaction_error, log_status
-from web3 import Web3
+from typing import List
 
 
-class DmailModule(BaseModule):
-    def __init__(self, nonce_manager: NonceManager):
-        super().__init__(nonce_manager)
-        self.w3 = Web3(Web3.HTTPProvider(SETTINGS["RPC_URL"]))
-        self.settings = SETTINGS["DMAIL"]
-        self.contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(CONTRACT_ADDRESSES["DMAIL"]['contract']),
-            abi=CONTRACT_ADDRESSES["DMAIL"]['abi']
-        )
+class DmailMixin:
+    """Сборка send_mail, общая для синхронного и asyncio вариантов Dmail"""
 
     @staticmethod
     def generate_email():
@@ -29,6 +27,29 @@ class DmailModule(BaseModule):
         fake = Faker()
         return fake.text()
 
+    def build_send_mail(self, wallet: Wallet) -> dict:
+        """Транзакция send_mail без газа и nonce (calldata кодируется локально)"""
+        email = self.generate_email()
+        text = self.generate_text()
+
+        return self.tx_builder.build(
+            wallet.address,
+            self.contract,
+            "send_mail",
+            (sha256(f"{email}".encode()).hexdigest(), sha256(f"{text}".encode()).hexdigest())
+        )
+
+
+class DmailModule(DmailMixin, BaseModule):
+    # Число сообщений случайное, задается в process_transaction
+    expected_transactions = None
+
+    def __init__(self, nonce_manager: NonceManager):
+        super().__init__(nonce_manager)
+        self.w3 = get_web3()
+        self.settings = SETTINGS["DMAIL"]
+        self.contract = self.contracts.get_contract(CONTRACT_ADDRESSES["DMAIL"]['contract'], CONTRACT_ADDRESSES["DMAIL"]['abi'])
+
     def get_available_chains(self, wallet_number: int = None, proxy: dict = None):
         return [
             Chain(
@@ -41,56 +62,130 @@ class DmailModule(BaseModule):
             )
         ]
 
+    def build_transactions(self, wallet: Wallet, destination_chain: Chain, amount: dict,
+                           wallet_number: int) -> List[dict]:
+        message_count = random.randint(self.settings["MESSAGE_COUNT"]["MIN"],
+                                       self.settings["MESSAGE_COUNT"]["MAX"])
+        log_status(wallet_number, f"Preparing {message_count} Dmail messages")
+        return [self.build_send_mail(wallet) for _ in range(message_count)]
+
     def process_transaction(self, wallet: Wallet, destination_chain: Chain, amount: dict,
                             wallet_number: int) -> TransactionResult:
         try:
             message_count = random.randint(self.settings["MESSAGE_COUNT"]["MIN"],
                                            self.settings["MESSAGE_COUNT"]["MAX"])
+            self.expect_transactions(message_count)
 
             tx_hash = None
             for i in range(message_count):
                 log_transaction_start(wallet_number, f"Processing Dmail message {i + 1}/{message_count}")
 
-                email = self.generate_email()
-                text = self.generate_text()
-
-                transaction = {
-                    "from": wallet.address,
-                    "gasPrice": self.w3.eth.gas_price,
-                    "chainId": self.w3.eth.chain_id
-                }
-
                 log_status(wallet_number, "Preparing Dmail transaction data")
 
-                tx = self.contract.functions.send_mail(
-                    sha256(f"{email}".encode()).hexdigest(),
-                    sha256(f"{text}".encode()).hexdigest()
-                ).build_transaction(transaction)
+                tx = self.build_send_mail(wallet)
 
-                # Получаем nonce через NonceManager
+                # Единственная оценка газа, затем nonce через NonceManager
+                tx["gas"] = self.estimate_gas(tx)
                 tx = self.prepare_transaction(wallet, tx)
 
-                # Оценка газа
-                tx["gas"] = self.w3.eth.estimate_gas(tx)
-
                 log_status(wallet_number, "Signing and sending Dmail transaction")
 
                 try:
                     # Подпись и отправка
-                    signed_tx = self.w3.eth.account.sign_transaction(tx, wallet.private_key)
+                    signed_tx = self.sign_transaction(wallet, tx, preflight=False)
                     tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                    receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
 
-                    if receipt["status"] != 1:
-                        self.handle_failed_transaction(wallet, tx)
-                        raise Exception("Transaction failed")
+                except Exception as e:
+                    self.handle_failed_transaction(wallet, tx, e)
+                    raise e
+
+                receipt = self.wait_for_receipt(tx_hash)
+
+                # Транзакция попала в блок, nonce израсходован даже при неуспехе
+                if receipt["status"] != 1:
+                    raise Exception("Transaction failed")
+
+                log_transaction_success(wallet_number, tx_hash.hex(), "Dmail transaction")
+
+            return TransactionResult(
+                success=True,
+                tx_hash=tx_hash.hex() if tx_hash else "",
+                module_name=self.module_name
+            )
+
+        except Exception as e:
+            error_message = str(e)
+            log_transaction_error(wallet_number, error_message, "Dmail transaction")
+            return TransactionResult(
+                success=False,
+                error_message=error_message,
+                module_name=self.module_name
+            )
+
 
-                    log_transaction_success(wallet_number, tx_hash.hex(), "Dmail transaction")
+class AsyncDmailModule(DmailMixin, AsyncBaseModule):
+    """Dmail для asyncio движка: та же логика, что у DmailModule, на AsyncWeb3"""
+
+    expected_transactions = None
+
+    def __init__(self, nonce_manager: NonceManager):
+        super().__init__(nonce_manager)
+        self.settings = SETTINGS["DMAIL"]
+        self.contract = get_contract_factory(self.async_w3).get_contract(
+            CONTRACT_ADDRESSES["DMAIL"]['contract'], CONTRACT_ADDRESSES["DMAIL"]['abi']
+        )
+
+    async def get_available_chains(self, wallet_number: int = None, proxy: dict = None):
+        return [
+            Chain(
+                id=SETTINGS["CHAIN_ID"],
+                name="Lisk",
+                rpc_url=SETTINGS["RPC_URL"],
+                currency_address=TOKENS['ETH'],
+                is_enabled=True,
+                supports_deposits=True
+            )
+        ]
+
+    async def process_transaction(self, wallet: Wallet, destination_chain: Chain, amount: dict,
+                                  wallet_number: int) -> TransactionResult:
+        try:
+            message_count = random.randint(self.settings["MESSAGE_COUNT"]["MIN"],
+                                           self.settings["MESSAGE_COUNT"]["MAX"])
+            self.expect_transactions(message_count)
+
+            tx_hash = None
+            for i in range(message_count):
+                log_transaction_start(wallet_number, f"Processing Dmail message {i + 1}/{message_count}")
+
+                log_status(wallet_number, "Preparing Dmail transaction data")
+
+                # Calldata кодируется локально, комиссия из FeeOracle может потребовать запрос к RPC
+                tx = await asyncio.to_thread(self.build_send_mail, wallet)
+
+                # Единственная оценка газа, затем nonce через NonceManager
+                tx["gas"] = await self.estimate_gas_async(tx)
+                tx = await self.prepare_transaction_async(wallet, tx)
+
+                log_status(wallet_number, "Signing and sending Dmail transaction")
+
+                try:
+                    # Подпись и отправка (оценка газа уже была симуляцией)
+                    signed_tx = get_signer().sign(wallet, tx)
+                    tx_hash = await self.async_w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
                 except Exception as e:
-                    self.handle_failed_transaction(wallet, tx)
+                    self.handle_failed_transaction(wallet, tx, e)
                     raise e
 
+                receipt = await self.wait_for_receipt_async(tx_hash)
+
+                # Транзакция попала в блок, nonce израсходован даже при неуспехе
+                if receipt["status"] != 1:
+                    raise Exception("Transaction failed")
+
+                log_transaction_success(wallet_number, tx_hash.hex(), "Dmail transaction")
+
             return TransactionResult(
                 success=True,
                 tx_hash=tx_hash.hex() if tx_hash else "",
@@ -104,4 +199,4 @@ class DmailModule(BaseModule):
                 success=False,
                 error_message=error_message,
                 module_name=self.module_name
-            )
\ No newline at end of file
+            )
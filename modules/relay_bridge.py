@@ -1,30 +1,31 @@
 import time
 import random
-import requests
-from web3 import Web3
-from typing import List
+from typing import List, Optional
 from core.wallet_manager import Chain, Wallet, TransactionResult
 from core.base_module import BaseModule
+from core.provider_registry import get_web3
 from core.nonce_manager import NonceManager
 from utils.logger import log_transaction_start, log_transaction_success, log_transaction_error, log_status
 from config.settings import SETTINGS
 from config.constants import *
+from utils.address import to_checksum
 
 
 class RelayBridge(BaseModule):
+    # Учитывает bridge_chain_id кошелька
+    is_bridge = True
+
     def __init__(self, nonce_manager: NonceManager):
         super().__init__(nonce_manager)
-        self.w3 = Web3(Web3.HTTPProvider(SETTINGS["RPC_URL"]))
+        self.w3 = get_web3()
         self.settings = SETTINGS["RELAY_BRIDGE"]
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
 
     def _prepare_transaction_data(self, quote_data: dict, wallet: Wallet) -> dict:
         """Подготовка данных транзакции"""
         tx_data = quote_data["steps"][0]["items"][0]["data"]
         tx_data.update({
             'value': int(tx_data['value']),
-            'to': self.w3.to_checksum_address(tx_data['to']),
+            'to': to_checksum(tx_data['to']),
             'maxFeePerGas': int(tx_data['maxFeePerGas']),
             'maxPriorityFeePerGas': int(tx_data['maxPriorityFeePerGas']),
             'from': wallet.address
@@ -66,24 +67,27 @@ class RelayBridge(BaseModule):
             log_status(wallet_number, "Signing and sending Relay transaction")
 
             try:
-                signed_tx = self.w3.eth.account.sign_transaction(tx_data, wallet.private_key)
+                signed_tx = self.sign_transaction(wallet, tx_data)
                 tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
-                log_status(wallet_number, "Monitoring transaction status")
-                success = self._monitor_transaction(tx_hash.hex(), request_id, wallet_number)
+            except Exception as e:
+                self.handle_failed_transaction(wallet, tx_data, e)
+                raise e
 
-                if not success:
-                    self.handle_failed_transaction(wallet, tx_data)
+            # Хеш в журнал сразу: при падении во время опроса --resume не отправит бридж повторно
+            if self.journal:
+                self.journal.record_tx(tx_hash)
 
-                return TransactionResult(
-                    success=success,
-                    tx_hash=tx_hash.hex(),
-                    module_name=self.module_name
-                )
+            log_status(wallet_number, "Monitoring transaction status")
+            success = self._monitor_transaction(tx_hash.hex(), request_id, wallet_number)
+            if self.journal and success is not None:
+                self.journal.set_tx_status(tx_hash, {"status": 1 if success else 0})
 
-            except Exception as e:
-                self.handle_failed_transaction(wallet, tx_data)
-                raise e
+            return TransactionResult(
+                success=bool(success),
+                tx_hash=tx_hash.hex(),
+                module_name=self.module_name
+            )
 
         except Exception as e:
             error_message = str(e)
@@ -91,7 +95,7 @@ class RelayBridge(BaseModule):
             return TransactionResult(False, error_message=error_message, module_name=self.module_name)
 
     def get_available_chains(self, wallet_number: int = None, proxy: dict = None) -> List[Chain]:
-        response = self.session.get(API_ENDPOINTS["RELAY"]["CHAINS"], proxies=proxy)
+        response = self.http.get(API_ENDPOINTS["RELAY"]["CHAINS"], headers=HEADERS, proxies=proxy)
         data = response.json()
 
         chains = []
@@ -112,8 +116,8 @@ class RelayBridge(BaseModule):
                 and chain.supports_deposits
                 and chain.id != API_ENDPOINTS["RELAY"]["ORIGIN_CHAIN_ID"]]
 
-    def _monitor_transaction(self, tx_hash: str, request_id: str, wallet_number: int) -> bool:
-        """Мониторинг статуса транзакции"""
+    def _monitor_transaction(self, tx_hash: str, request_id: str, wallet_number: int) -> Optional[bool]:
+        """Мониторинг статуса транзакции, None - статус так и не определился"""
         for attempt in range(self.settings["MAX_STATUS_CHECKS"]):
             log_status(wallet_number, f"Checking Relay transaction status (attempt {attempt + 1}/{self.settings['MAX_STATUS_CHECKS']})")
             status_data = self._check_transaction_status(request_id)
@@ -130,12 +134,12 @@ class RelayBridge(BaseModule):
             time.sleep(self.settings["STATUS_CHECK_DELAY"])
 
         log_transaction_error(wallet_number, f"Transaction status check timeout after {self.settings['MAX_STATUS_CHECKS']} attempts: {tx_hash}")
-        return False
+        return None
 
     def _check_transaction_status(self, request_id: str, wallet_number: int = None, proxy: dict = None) -> dict:
         """Проверка статуса транзакции"""
         params = {"requestId": request_id}
-        response = self.session.get(API_ENDPOINTS["RELAY"]["STATUS"], params=params, proxies=proxy)
+        response = self.http.get(API_ENDPOINTS["RELAY"]["STATUS"], headers=HEADERS, params=params, proxies=proxy)
         return response.json()
 
     def _check_chain_config(self, destination_chain_id: int, wallet_number: int = None, proxy: dict = None) -> bool:
@@ -143,12 +147,12 @@ class RelayBridge(BaseModule):
             "originChainId": str(API_ENDPOINTS["RELAY"]["ORIGIN_CHAIN_ID"]),
             "destinationChainId": str(destination_chain_id)
         }
-        response = self.session.get(API_ENDPOINTS["RELAY"]["CONFIG"], params=params, proxies=proxy)
+        response = self.http.get(API_ENDPOINTS["RELAY"]["CONFIG"], headers=HEADERS, params=params, proxies=proxy)
         return response.json().get("enabled", False)
 
     def _get_quote(self, wallet_address: str, destination_chain: Chain, wallet_number: int = None,
                    proxy: dict = None) -> dict:
-        balance = self.w3.eth.get_balance(wallet_address)
+        balance = self.get_eth_balance(wallet_address)
 
         min_amount = balance * self.settings["AMOUNT_PERCENTAGE"]["MIN"]
         max_amount = balance * self.settings["AMOUNT_PERCENTAGE"]["MAX"]
@@ -166,5 +170,5 @@ class RelayBridge(BaseModule):
             "slippageTolerance": self.settings["SLIPPAGE"],
             "useExternalLiquidity": False
         }
-        response = self.session.post(API_ENDPOINTS["RELAY"]["QUOTE"], json=payload, proxies=None)
+        response = self.http.post(API_ENDPOINTS["RELAY"]["QUOTE"], headers=HEADERS, json=payload, proxies=None)
         return response.json()
\ No newline at end of file
@@ -1,22 +1,20 @@
 from core.base_module import BaseModule
+from core.provider_registry import get_web3
 from core.wallet_manager import Wallet, Chain, TransactionResult
 from core.nonce_manager import NonceManager
 from config.settings import SETTINGS
-from web3 import Web3
 from utils.logger import log_transaction_start, log_transaction_success, log_transaction_error, log_status
 import random
 from config.constants import *
+from utils.address import to_checksum
 
 
 class SafeModule(BaseModule):
     def __init__(self, nonce_manager: NonceManager):
         super().__init__(nonce_manager)
-        self.w3 = Web3(Web3.HTTPProvider(RPC_URL))
+        self.w3 = get_web3(RPC_URL)
         self.settings = SETTINGS
-        self.contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(CONTRACT_ADDRESSES["SAFE"]['contract']),
-            abi=CONTRACT_ADDRESSES['SAFE']['ABI']
-        )
+        self.contract = self.contracts.get_contract(CONTRACT_ADDRESSES["SAFE"]['contract'], CONTRACT_ADDRESSES['SAFE']['ABI'])
 
     def get_available_chains(self, wallet_number: int = None, proxy: dict = None):
         return [
@@ -42,54 +40,49 @@ class SafeModule(BaseModule):
 
             log_status(wallet_number, "Preparing Safe contract interaction")
 
-            # Создаем транзакцию через метод контракта
-            tx = self.contract.functions.createProxyWithNonce(
-                self.w3.to_checksum_address(CONTRACT_ADDRESSES["SAFE"]["IMPLEMENTATION"]),
-                CONTRACT_ADDRESSES["SAFE"]["ENCODED_PARAMS"],
-                random_nonce
-            ).build_transaction({
-                "from": wallet.address,
-                "gasPrice": self.w3.eth.gas_price,
-                "chainId": self.w3.eth.chain_id
-            })
-
-            # Получаем nonce через NonceManager
-            tx = self.prepare_transaction(wallet, tx)
-
-            # Оценка газа
-            tx["gas"] = int(self.w3.eth.estimate_gas(tx) * 1.5)
+            # Создаем транзакцию через метод контракта (оценка газа и nonce из NonceManager)
+            tx = self.build_contract_transaction(
+                wallet,
+                self.contract,
+                "createProxyWithNonce",
+                (
+                    to_checksum(CONTRACT_ADDRESSES["SAFE"]["IMPLEMENTATION"]),
+                    CONTRACT_ADDRESSES["SAFE"]["ENCODED_PARAMS"],
+                    random_nonce
+                ),
+                gas_multiplier=1.5
+            )
 
             log_status(wallet_number, "Signing and sending Safe transaction")
 
             try:
                 # Подписываем и отправляем транзакцию
-                signed_tx = self.w3.eth.account.sign_transaction(tx, wallet.private_key)
+                signed_tx = self.sign_transaction(wallet, tx, preflight=False)
                 tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
-                # Ждем подтверждения
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-
-                if receipt["status"] == 1:
-                    log_transaction_success(wallet_number, tx_hash.hex(), "Safe deployment")
-                    return TransactionResult(
-                        success=True,
-                        tx_hash=tx_hash.hex(),
-                        module_name=self.module_name
-                    )
-                else:
-                    self.handle_failed_transaction(wallet, tx)
-                    log_transaction_error(wallet_number, "Transaction failed", "Safe deployment")
-                    return TransactionResult(
-                        success=False,
-                        tx_hash=tx_hash.hex(),
-                        error_message="Transaction failed",
-                        module_name=self.module_name
-                    )
-
             except Exception as e:
-                self.handle_failed_transaction(wallet, tx)
+                self.handle_failed_transaction(wallet, tx, e)
                 raise e
 
+            # Ждем подтверждения
+            receipt = self.wait_for_receipt(tx_hash)
+
+            if receipt["status"] == 1:
+                log_transaction_success(wallet_number, tx_hash.hex(), "Safe deployment")
+                return TransactionResult(
+                    success=True,
+                    tx_hash=tx_hash.hex(),
+                    module_name=self.module_name
+                )
+            else:
+                log_transaction_error(wallet_number, "Transaction failed", "Safe deployment")
+                return TransactionResult(
+                    success=False,
+                    tx_hash=tx_hash.hex(),
+                    error_message="Transaction failed",
+                    module_name=self.module_name
+                )
+
         except Exception as e:
             error_message = str(e)
             log_transaction_error(wallet_number, error_message, "Safe deployment")
@@ -1,18 +1,24 @@
 from core.base_module import BaseModule
+from core.provider_registry import ProviderRegistry, get_web3
+from core.fee_oracle import get_fee_oracle
+from core.chain_registry import get_chain_registry
 from core.wallet_manager import Wallet, Chain, TransactionResult
 from core.nonce_manager import NonceManager
 from config.settings import SETTINGS
 from web3 import Web3
 from utils.logger import log_transaction_start, log_transaction_success, log_transaction_error, log_status
-import requests
 import random
 from config.constants import *
+from utils.address import to_checksum
 
 
 class SuperBridgeModule(BaseModule):
+    # Учитывает bridge_chain_id кошелька
+    is_bridge = True
+
     def __init__(self, nonce_manager: NonceManager):
         super().__init__(nonce_manager)
-        self.w3 = Web3(Web3.HTTPProvider(SETTINGS["RPC_URL"]))
+        self.w3 = get_web3()
         self.settings = SETTINGS["SUPERBRIDGE"]
         self.headers = {
             'accept': 'application/json, text/plain, */*',
@@ -22,19 +28,15 @@ class SuperBridgeModule(BaseModule):
             'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
 
-    def get_chain_info(self, wallet_number: int, proxy: dict) -> dict:
+    def get_chain_info(self, chain_id: int, wallet_number: int, proxy: dict) -> dict:
+        """Информация о сети из общего индекса chains.json"""
         try:
-            log_status(wallet_number, "Getting chain information for SuperBridge")
-            response = requests.get('https://chainid.network/chains.json', proxies=proxy)
-            if response.status_code == 200:
-                chains_data = response.json()
+            chain = get_chain_registry().get(chain_id, proxy)
+            if chain:
                 return {
-                    chain['chainId']: {
-                        'rpc': chain.get('rpc', [])[0] if chain.get('rpc') else None,
-                        'name': chain.get('name'),
-                        'currency': chain.get('nativeCurrency', {}).get('symbol')
-                    }
-                    for chain in chains_data
+                    'rpc': chain.get('rpc', [])[0] if chain.get('rpc') else None,
+                    'name': chain.get('name'),
+                    'currency': chain.get('nativeCurrency', {}).get('symbol')
                 }
             return {}
         except Exception as e:
@@ -44,10 +46,9 @@ class SuperBridgeModule(BaseModule):
     def get_gas_price(self, chain_id: int, wallet_number: int, proxy: dict) -> str:
         """Получение gas price в сети назначения"""
         try:
-            chains_info = self.get_chain_info(wallet_number, proxy)
-            if chain_id in chains_info and chains_info[chain_id]['rpc']:
-                w3 = Web3(Web3.HTTPProvider(chains_info[chain_id]['rpc']))
-                gas_price = w3.eth.gas_price
+            chain_info = self.get_chain_info(chain_id, wallet_number, proxy)
+            if chain_info.get('rpc'):
+                gas_price = get_fee_oracle(chain_info['rpc']).gas_price()
                 return str(gas_price)
         except Exception as e:
             log_transaction_error(wallet_number, f"Failed to get gas price for chain {chain_id}: {e}", "SuperBridge gas check")
@@ -68,7 +69,7 @@ class SuperBridgeModule(BaseModule):
             "toTokenAddress": TOKENS["ETH"],
             "fromTokenDecimals": 18,
             "toTokenDecimals": 18,
-            "fromGasPrice": str(self.w3.eth.gas_price),
+            "fromGasPrice": str(self.fee_oracle.gas_price()),
             "toGasPrice": self.get_gas_price(destination_chain_id, wallet_number, proxy),
             "graffiti": "superbridge",
             "recipient": wallet,
@@ -76,7 +77,7 @@ class SuperBridgeModule(BaseModule):
             "forceViaL1": False
         }
 
-        response = requests.post(
+        response = self.http.post(
             'https://api.superbridge.app/api/v2/bridge/routes',
             headers=self.headers,
             json=payload,
@@ -112,7 +113,7 @@ class SuperBridgeModule(BaseModule):
             log_transaction_start(wallet_number, f"Starting SuperBridge transaction to {destination_chain.name}")
 
             # Проверяем баланс
-            balance = self.w3.eth.get_balance(wallet.address)
+            balance = self.get_eth_balance(wallet.address)
             balance_eth = float(Web3.from_wei(balance, 'ether'))
 
             # Определяем сумму для бриджа
@@ -138,10 +139,10 @@ class SuperBridgeModule(BaseModule):
             # Создаем транзакцию
             transaction = {
                 "from": wallet.address,
-                "to": self.w3.to_checksum_address(tx_data["to"]),
+                "to": to_checksum(tx_data["to"]),
                 "data": tx_data["data"],
                 "value": int(tx_data["value"]),
-                "gasPrice": self.w3.eth.gas_price,
+                **self.fee_oracle.get_fee_fields(),
                 "chainId": self.w3.eth.chain_id
             }
 
@@ -150,43 +151,45 @@ class SuperBridgeModule(BaseModule):
 
             # Оценка газа
             estimated_gas = bridge_data["steps"][0]["estimatedGasLimit"]
-            transaction["gas"] = int(estimated_gas * 1.5)  # Добавляем множитель для надежности
+            transaction["gas"] = min(  # Добавляем множитель для надежности, но не выше лимита блока
+                int(estimated_gas * 1.5),
+                ProviderRegistry.get_block_gas_limit()
+            )
 
             log_status(wallet_number, "Signing and sending SuperBridge transaction")
 
             try:
                 # Подписываем и отправляем транзакцию
-                signed_tx = self.w3.eth.account.sign_transaction(transaction, wallet.private_key)
+                signed_tx = self.sign_transaction(wallet, transaction)
                 tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
-                log_status(
-                    wallet_number,
-                    f"Bridging {amount_to_bridge:.6f} ETH to {destination_chain.name}"
-                )
+            except Exception as e:
+                self.handle_failed_transaction(wallet, transaction, e)
+                raise e
 
-                # Ждем подтверждения
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            log_status(
+                wallet_number,
+                f"Bridging {amount_to_bridge:.6f} ETH to {destination_chain.name}"
+            )
 
-                if receipt["status"] == 1:
-                    log_transaction_success(wallet_number, tx_hash.hex(), "SuperBridge transaction")
-                    return TransactionResult(
-                        success=True,
-                        tx_hash=tx_hash.hex(),
-                        module_name=self.module_name
-                    )
-                else:
-                    self.handle_failed_transaction(wallet, transaction)
-                    log_transaction_error(wallet_number, "Transaction failed", "SuperBridge transaction")
-                    return TransactionResult(
-                        success=False,
-                        tx_hash=tx_hash.hex(),
-                        error_message="Transaction failed",
-                        module_name=self.module_name
-                    )
+            # Ждем подтверждения
+            receipt = self.wait_for_receipt(tx_hash)
 
-            except Exception as e:
-                self.handle_failed_transaction(wallet, transaction)
-                raise e
+            if receipt["status"] == 1:
+                log_transaction_success(wallet_number, tx_hash.hex(), "SuperBridge transaction")
+                return TransactionResult(
+                    success=True,
+                    tx_hash=tx_hash.hex(),
+                    module_name=self.module_name
+                )
+            else:
+                log_transaction_error(wallet_number, "Transaction failed", "SuperBridge transaction")
+                return TransactionResult(
+                    success=False,
+                    tx_hash=tx_hash.hex(),
+                    error_message="Transaction failed",
+                    module_name=self.module_name
+                )
 
         except Exception as e:
             error_message = str(e)
@@ -201,12 +204,10 @@ class SuperBridgeModule(BaseModule):
         """Получение списка доступных сетей для бриджа"""
         log_status(wallet_number or 0, "Getting available chains for SuperBridge")
         supported_chains = [8453, 10, 34443, 7777777, 130]  # ID поддерживаемых сетей
-        chains_info = self.get_chain_info(wallet_number, proxy)
-
         available_chains = []
         for chain_id in supported_chains:
-            if chain_id in chains_info:
-                chain_data = chains_info[chain_id]
+            chain_data = self.get_chain_info(chain_id, wallet_number, proxy)
+            if chain_data:
                 available_chains.append(
                     Chain(
                         id=chain_id,
@@ -1,4 +1,5 @@
 from core.base_module import BaseModule
+from core.provider_registry import get_web3
 from core.wallet_manager import Wallet, Chain, TransactionResult
 from core.nonce_manager import NonceManager
 from config.settings import SETTINGS
@@ -7,13 +8,14 @@ from utils.logger import log_transaction_start, log_transaction_success, log_tra
 import random
 import requests
 import time
+from config.constants import *
 
 
 class WethModule(BaseModule):
     def __init__(self, nonce_manager: NonceManager):
         super().__init__(nonce_manager)
-        self.w3 = Web3(Web3.HTTPProvider(SETTINGS["RPC_URL"]))
-        self.contract_address = "0x4200000000000000000000000000000000000006"
+        self.w3 = get_web3()
+        self.contract_address = WETH_ADDRESS
         self.eth_price = None
         self.last_price_update = 0
         self.price_update_interval = 60  # обновляем цену раз в минуту
@@ -35,10 +37,7 @@ class WethModule(BaseModule):
                 "type": "function"
             }
         ]
-        self.contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(self.contract_address),
-            abi=self.abi
-        )
+        self.contract = self.contracts.get_contract(self.contract_address, self.abi)
 
     def get_eth_price(self) -> float:
         """Получает актуальную цену ETH с CoinGecko API с кэшированием"""
@@ -48,7 +47,7 @@ class WethModule(BaseModule):
         if self.eth_price is None or (current_time - self.last_price_update) > self.price_update_interval:
             try:
                 # Делаем запрос к CoinGecko API
-                response = requests.get(
+                response = self.http.get(
                     "https://api.coingecko.com/api/v3/simple/price",
                     params={
                         "ids": "ethereum",
@@ -69,7 +68,7 @@ class WethModule(BaseModule):
 
     def get_eth_balance_in_usd(self, address: str) -> float:
         """Получает баланс ETH и конвертирует его в USD"""
-        balance_wei = self.w3.eth.get_balance(address)
+        balance_wei = self.get_eth_balance(address)
         balance_eth = Web3.from_wei(balance_wei, 'ether')
         return float(balance_eth) * self.get_eth_price()
 
@@ -99,7 +98,7 @@ class WethModule(BaseModule):
             log_status(wallet_number, f"Target ETH balance: ${target_usd_amount:.2f} ({needed_eth:.6f} ETH)")
 
             # Проверяем баланс WETH
-            weth_balance = self.contract.functions.balanceOf(wallet.address).call()
+            weth_balance = self.get_token_balance(wallet.address, self.contract)
             weth_balance_eth = Web3.from_wei(weth_balance, 'ether')
             weth_balance_usd = float(weth_balance_eth) * eth_price
 
@@ -121,48 +120,39 @@ class WethModule(BaseModule):
                 return TransactionResult(success=True, module_name=self.module_name)
 
             # Создаем транзакцию для withdraw
-            transaction = self.contract.functions.withdraw(amount_to_withdraw).build_transaction({
-                'from': wallet.address,
-                'gas': 54110,
-                'gasPrice': self.w3.eth.gas_price,
-                'chainId': self.w3.eth.chain_id
-            })
-
-            # Получаем nonce через NonceManager
-            transaction = self.prepare_transaction(wallet, transaction)
+            # Газ фиксированный, nonce из NonceManager
+            transaction = self.build_contract_transaction(wallet, self.contract, "withdraw", (amount_to_withdraw,), gas=54110)
 
             try:
                 # Подписываем и отправляем транзакцию
-                signed_tx = self.w3.eth.account.sign_transaction(transaction, wallet.private_key)
+                signed_tx = self.sign_transaction(wallet, transaction)
                 tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
-                # Ждем подтверждения
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-
-                if receipt["status"] == 1:
-                    new_eth_balance_usd = self.get_eth_balance_in_usd(wallet.address)
-                    log_transaction_success(wallet_number,
-                                          f"{tx_hash.hex()} (New ETH balance: ${new_eth_balance_usd:.2f})",
-                                          "WETH to ETH conversion")
-                    return TransactionResult(
-                        success=True,
-                        tx_hash=tx_hash.hex(),
-                        module_name=self.module_name
-                    )
-                else:
-                    self.handle_failed_transaction(wallet, transaction)
-                    log_transaction_error(wallet_number, "Transaction failed", "WETH to ETH conversion")
-                    return TransactionResult(
-                        success=False,
-                        tx_hash=tx_hash.hex(),
-                        error_message="Transaction failed",
-                        module_name=self.module_name
-                    )
-
             except Exception as e:
-                self.handle_failed_transaction(wallet, transaction)
+                self.handle_failed_transaction(wallet, transaction, e)
                 raise e
 
+            # Ждем подтверждения
+            receipt = self.wait_for_receipt(tx_hash)
+
+            if receipt["status"] == 1:
+                new_eth_balance_usd = self.get_eth_balance_in_usd(wallet.address)
+                log_transaction_success(wallet_number,
+                                      f"{tx_hash.hex()} (New ETH balance: ${new_eth_balance_usd:.2f})",
+                                      "WETH to ETH conversion")
+                return TransactionResult(
+                    success=True,
+                    tx_hash=tx_hash.hex(),
+                    module_name=self.module_name
+                )
+            else:
+                log_transaction_error(wallet_number, "Transaction failed", "WETH to ETH conversion")
+                return TransactionResult(
+                    success=False,
+                    tx_hash=tx_hash.hex(),
+                    error_message="Transaction failed",
+                    module_name=self.module_name
+                )
+
         except Exception as e:
             error_message = str(e)
             log_transaction_error(wallet_number, error_message, "WETH to ETH conversion")
@@ -190,7 +180,7 @@ class WethModule(BaseModule):
             log_transaction_start(wallet_number, "Checking WETH balance")
 
             # Проверяем баланс WETH
-            weth_balance = self.contract.functions.balanceOf(wallet.address).call()
+            weth_balance = self.get_token_balance(wallet.address, self.contract)
 
             if weth_balance == 0:
                 log_status(wallet_number, "No WETH balance found, skipping")
@@ -202,45 +192,36 @@ class WethModule(BaseModule):
             log_status(wallet_number, f"Found {Web3.from_wei(weth_balance, 'ether')} WETH, initiating withdrawal")
 
             # Создаем транзакцию для withdraw
-            transaction = self.contract.functions.withdraw(weth_balance).build_transaction({
-                'from': wallet.address,
-                'gas': 54110,
-                'gasPrice': self.w3.eth.gas_price,
-                'chainId': self.w3.eth.chain_id
-            })
-
-            # Получаем nonce через NonceManager
-            transaction = self.prepare_transaction(wallet, transaction)
+            # Газ фиксированный, nonce из NonceManager
+            transaction = self.build_contract_transaction(wallet, self.contract, "withdraw", (weth_balance,), gas=54110)
 
             try:
                 # Подписываем и отправляем транзакцию
-                signed_tx = self.w3.eth.account.sign_transaction(transaction, wallet.private_key)
+                signed_tx = self.sign_transaction(wallet, transaction)
                 tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
-                # Ждем подтверждения
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-
-                if receipt["status"] == 1:
-                    log_transaction_success(wallet_number, tx_hash.hex(), "WETH withdrawal")
-                    return TransactionResult(
-                        success=True,
-                        tx_hash=tx_hash.hex(),
-                        module_name=self.module_name
-                    )
-                else:
-                    self.handle_failed_transaction(wallet, transaction)
-                    log_transaction_error(wallet_number, "Transaction failed", "WETH withdrawal")
-                    return TransactionResult(
-                        success=False,
-                        tx_hash=tx_hash.hex(),
-                        error_message="Transaction failed",
-                        module_name=self.module_name
-                    )
-
             except Exception as e:
-                self.handle_failed_transaction(wallet, transaction)
+                self.handle_failed_transaction(wallet, transaction, e)
                 raise e
 
+            # Ждем подтверждения
+            receipt = self.wait_for_receipt(tx_hash)
+
+            if receipt["status"] == 1:
+                log_transaction_success(wallet_number, tx_hash.hex(), "WETH withdrawal")
+                return TransactionResult(
+                    success=True,
+                    tx_hash=tx_hash.hex(),
+                    module_name=self.module_name
+                )
+            else:
+                log_transaction_error(wallet_number, "Transaction failed", "WETH withdrawal")
+                return TransactionResult(
+                    success=False,
+                    tx_hash=tx_hash.hex(),
+                    error_message="Transaction failed",
+                    module_name=self.module_name
+                )
+
         except Exception as e:
             error_message = str(e)
             log_transaction_error(wallet_number, error_message, "WETH withdrawal")
@@ -0,0 +1,15 @@
+from functools import lru_cache
+
+from eth_utils import to_checksum_address
+
+# Адреса кошельков, контрактов и ответов API - с запасом на 10k+ кошельков
+CHECKSUM_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=CHECKSUM_CACHE_SIZE)
+def to_checksum(address: str) -> str:
+    """
+    to_checksum_address с LRU кэшем: keccak считается один раз на адрес,
+    повторные вызовы для констант и уже загруженных кошельков берутся из кэша
+    """
+    return to_checksum_address(address)
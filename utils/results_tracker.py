@@ -1,17 +1,38 @@
+import json
+import os
+import queue
+import threading
+import time
 import pandas as pd
 from datetime import datetime
 from loguru import logger
 from pathlib import Path
+from typing import List, Optional
+from config.settings import SETTINGS
 from core.wallet_manager import Wallet, Chain, TransactionResult
 import openpyxl
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+COLUMNS = ['Date', 'Time', 'Wallet Address', 'Chain', 'Chain ID', 'Module', 'Status', 'Transaction Hash', 'Error']
+
 
 class ResultsTracker:
+    """
+    Результаты пишутся в append-only журнал JSON Lines: update_results только кладет строку
+    в очередь, файлом владеет один поток записи. Оформленный results.xlsx собирается
+    из журнала на контрольных точках (CHECKPOINT_INTERVAL) и при завершении (save_results).
+    """
+
     def __init__(self, filename: str = "results.xlsx"):
         self.filename = filename
-        self.results = []
+        self.settings = SETTINGS["RESULTS"]
+        self.journal_path = Path(self.settings["JOURNAL_PATH"])
+        self._queue: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        # После save_results поток записи не перезапускается до следующего begin_run
+        self._closed = False
 
         # Определяем стили
         self.header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
@@ -27,10 +48,10 @@ class ResultsTracker:
         )
 
     def update_results(self, wallet: Wallet, chain: Chain, result: TransactionResult):
-        # Добавляем результат в память
-        self.results.append({
-            'Date': datetime.now().strftime('%Y-%m-%d'),
-            'Time': datetime.now().strftime('%H:%M:%S'),
+        now = datetime.now()
+        row = {
+            'Date': now.strftime('%Y-%m-%d'),
+            'Time': now.strftime('%H:%M:%S'),
             'Wallet Address': wallet.address,
             'Chain': chain.name,
             'Chain ID': chain.id,
@@ -38,81 +59,129 @@ class ResultsTracker:
             'Status': 'Success' if result.success else 'Failed',
             'Transaction Hash': 'https://blockscout.lisk.com/tx/0x'+result.tx_hash if result.tx_hash else '-',
             'Error': result.error_message if result.error_message else '-'
-        })
-
+        }
+        # Под блокировкой: строка не попадет в очередь после сигнала остановки писателя
+        with self._writer_lock:
+            if self._closed:
+                # Результат пришел после save_results - дописываем сразу, в results.xlsx он попадет при следующем экспорте
+                logger.warning(f"Result for {wallet.address} arrived after results were saved")
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as journal:
+                    journal.write(json.dumps(row, ensure_ascii=False) + "\n")
+                return
+            self._ensure_writer()
+            self._queue.put(row)
+
+    def begin_run(self, resume: bool = False):
+        """
+        Начало запуска (один раз, до первых результатов). При --resume журнал дописывается,
+        иначе строки прошлого запуска переносятся в results.<время>.jsonl, а не удаляются -
+        они могли не попасть в results.xlsx, если запуск упал
+        """
+        with self._writer_lock:
+            self._closed = False
+        if resume or not self.journal_path.exists() or not self.journal_path.stat().st_size:
+            return
+        suffix = datetime.fromtimestamp(self.journal_path.stat().st_mtime).strftime('%Y%m%d-%H%M%S')
+        archive_path = self.journal_path.with_name(f"{self.journal_path.stem}.{suffix}{self.journal_path.suffix}")
+        os.replace(self.journal_path, archive_path)
+        logger.info(f"Previous results journal moved to {archive_path}")
+
+    def _ensure_writer(self):
+        """Запуск потока записи, вызывается под _writer_lock"""
+        if self._writer is None:
+            # Журнал только дописывается - перезапуск потока записи строки не удаляет
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = threading.Thread(target=self._write_loop, name="ResultsWriter", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        """Единственный писатель журнала: дописывает строки и собирает Excel на контрольных точках"""
+        interval = self.settings["CHECKPOINT_INTERVAL"]
+        last_checkpoint = time.monotonic()
+        dirty = False
+
+        with open(self.journal_path, "a", encoding="utf-8") as journal:
+            while True:
+                try:
+                    row = self._queue.get(timeout=1)
+                except queue.Empty:
+                    pass
+                else:
+                    if row is None:
+                        break
+                    journal.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    dirty = True
+                    # Пока очередь не пуста, строки пишутся без flush
+                    if not self._queue.empty():
+                        continue
+                    journal.flush()
+
+                if interval and dirty and time.monotonic() - last_checkpoint >= interval:
+                    self.export_excel()
+                    last_checkpoint = time.monotonic()
+                    dirty = False
+
+    def read_results(self) -> List[dict]:
+        if not self.journal_path.exists():
+            return []
+        with open(self.journal_path, encoding="utf-8") as journal:
+            return [json.loads(line) for line in journal if line.strip()]
+
+    def export_excel(self, results: List[dict] = None):
+        """Оформленный results.xlsx из журнала за один проход, без перечитывания книги"""
         try:
-            # Создаем DataFrame
-            df = pd.DataFrame(self.results)
-
-            # Сохраняем в Excel
-            df.to_excel(self.filename, index=False, engine='openpyxl')
-
-            # Применяем форматирование
-            self._apply_formatting()
+            if results is None:
+                results = self.read_results()
 
-            logger.debug(f"Results updated successfully for address {wallet.address}")
-
-        except Exception as e:
-            logger.error(f"Error updating results: {str(e)}")
-
-    def _apply_formatting(self):
-        try:
-            wb = openpyxl.load_workbook(self.filename)
+            wb = openpyxl.Workbook()
             ws = wb.active
+            widths = [len(column) for column in COLUMNS]
 
             # Форматирование заголовков
+            ws.append(COLUMNS)
             for cell in ws[1]:
                 cell.fill = self.header_fill
                 cell.font = Font(bold=True, color="FFFFFF")
                 cell.alignment = Alignment(horizontal='center', vertical='center')
                 cell.border = self.border
 
-            # Автоматическая ширина столбцов
-            for column in ws.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-
-                adjusted_width = min(max_length + 2, 50)  # Ограничиваем максимальную ширину
-                ws.column_dimensions[column_letter].width = adjusted_width
-
             # Форматирование данных
-            for row in ws.iter_rows(min_row=2):
-                # Центрирование всех ячеек
-                for cell in row:
+            for row_index, result in enumerate(results, start=2):
+                # Окрашивание строк в зависимости от статуса
+                fill = self.success_fill if result['Status'] == 'Success' else self.error_fill
+                for column_index, column in enumerate(COLUMNS):
+                    value = result.get(column)
+                    cell = ws.cell(row=row_index, column=column_index + 1, value=value)
                     cell.alignment = Alignment(horizontal='center', vertical='center')
                     cell.border = self.border
-
-                # Окрашивание строк в зависимости от статуса
-                status_cell = row[6]  # Колонка 'Status'
-                fill = self.success_fill if status_cell.value == 'Success' else self.error_fill
-
-                for cell in row:
                     cell.fill = fill
+                    widths[column_index] = max(widths[column_index], len(str(value)))
 
                 # Форматирование хеша транзакции
-                tx_hash_cell = row[7]  # Колонка 'Transaction Hash'
-                if tx_hash_cell.value and tx_hash_cell.value != '-':
-                    tx_hash_cell.font = Font(color="0000FF", underline="single")
+                if result['Transaction Hash'] != '-':
+                    ws.cell(row=row_index, column=COLUMNS.index('Transaction Hash') + 1).font = \
+                        Font(color="0000FF", underline="single")
+
+            # Автоматическая ширина столбцов, ограничиваем максимальную ширину
+            for column_index, width in enumerate(widths, start=1):
+                ws.column_dimensions[get_column_letter(column_index)].width = min(width + 2, 50)
 
             # Замораживаем верхнюю строку
             ws.freeze_panes = 'A2'
 
-            # Сохраняем изменения
-            wb.save(self.filename)
+            # Через временный файл - открытый results.xlsx не окажется наполовину записанным
+            temp_path = f"{self.filename}.tmp"
+            wb.save(temp_path)
+            os.replace(temp_path, self.filename)
+            logger.debug(f"Results exported to {self.filename} ({len(results)} rows)")
 
         except Exception as e:
-            logger.error(f"Error applying formatting: {str(e)}")
+            logger.error(f"Error exporting results: {str(e)}")
 
-    def get_statistics(self):
+    def get_statistics(self, results: List[dict] = None):
         """Получение статистики по результатам"""
-        df = pd.DataFrame(self.results)
+        df = pd.DataFrame(results if results is not None else self.read_results())
         if not df.empty:
             stats = {
                 'Total Transactions': len(df),
@@ -126,14 +195,23 @@ class ResultsTracker:
         return None
 
     def save_results(self):
-        """Сохраняет все накопленные результаты и применяет форматирование"""
+        """
+        Завершение записи журнала, итоговый results.xlsx и статистика (при выходе).
+        Excel пересобирается и без результатов, чтобы не остался файл прошлого запуска
+        """
         try:
-            df = pd.DataFrame(self.results)
-            df.to_excel(self.filename, index=False)
-            self._apply_formatting()
+            with self._writer_lock:
+                self._closed = True
+                writer, self._writer = self._writer, None
+            if writer is not None:
+                self._queue.put(None)
+                writer.join()
+
+            results = self.read_results()
+            self.export_excel(results)
 
             # Выводим статистику
-            stats = self.get_statistics()
+            stats = self.get_statistics(results)
             if stats:
                 logger.info("Transaction Statistics:")
                 for key, value in stats.items():
@@ -141,4 +219,4 @@ class ResultsTracker:
 
             logger.info(f"All results saved to {self.filename}")
         except Exception as e:
-            logger.error(f"Error saving results: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error saving results: {str(e)}")